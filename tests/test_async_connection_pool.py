@@ -0,0 +1,147 @@
+"""
+Tests for AsyncConnectionPool, with asyncssh replaced by an in-memory fake.
+"""
+
+import asyncio
+import time
+import types
+from unittest import mock
+
+import pytest
+
+from ztw_manager import async_connection_pool
+from ztw_manager.async_connection_pool import AsyncConnectionPool
+
+# Author: Vamsi
+
+
+class FakeProcess:
+    """Stand-in for asyncssh.SSHClientProcess."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class FakeConnection:
+    """Stand-in for asyncssh.SSHClientConnection."""
+
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+    def create_process(self, command=None, **kwargs):
+        return FakeProcess()
+
+
+@pytest.fixture
+def fake_asyncssh():
+    """Patch the module's asyncssh with a fake whose connect() yields FakeConnections."""
+    async def connect(host, **kwargs):
+        # Yield once so concurrent callers overlap the handshake
+        await asyncio.sleep(0)
+        return FakeConnection()
+
+    fake = types.SimpleNamespace(
+        connect=mock.AsyncMock(side_effect=connect),
+        Error=Exception,
+        ChannelOpenError=RuntimeError,
+        OPEN_RESOURCE_SHORTAGE=4,
+    )
+    with mock.patch.object(async_connection_pool, 'asyncssh', fake):
+        yield fake
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_requires_asyncssh():
+    with mock.patch.object(async_connection_pool, 'asyncssh', None):
+        with pytest.raises(ImportError):
+            AsyncConnectionPool()
+
+
+def test_concurrent_callers_share_one_handshake(fake_asyncssh):
+    async def scenario():
+        async with AsyncConnectionPool() as pool:
+            conns = await asyncio.gather(*(pool.get_connection('h', 22, 'u', password='p')
+                                           for _ in range(5)))
+            return conns, pool.get_connection_info('h', 22, 'u')
+
+    conns, info = run(scenario())
+    assert fake_asyncssh.connect.await_count == 1
+    assert all(conn is conns[0] for conn in conns)
+    assert info.use_count == 5
+
+
+def test_requires_credentials(fake_asyncssh):
+    async def scenario():
+        async with AsyncConnectionPool() as pool:
+            await pool.get_connection('h', 22, 'u')
+
+    with pytest.raises(ValueError):
+        run(scenario())
+
+
+def test_full_pool_keeps_recently_used_connections(fake_asyncssh):
+    async def scenario():
+        async with AsyncConnectionPool(max_connections=1, max_idle_time=300) as pool:
+            first = await pool.get_connection('a', 22, 'u', password='p')
+            await pool.get_connection('b', 22, 'u', password='p')
+            return first.is_closed(), len(pool.connections)
+
+    first_closed, size = run(scenario())
+    assert not first_closed
+    assert size == 2
+
+
+def test_full_pool_evicts_idle_connection(fake_asyncssh):
+    async def scenario():
+        async with AsyncConnectionPool(max_connections=1, max_idle_time=300) as pool:
+            first = await pool.get_connection('a', 22, 'u', password='p')
+            pool.get_connection_info('a', 22, 'u').last_used = time.monotonic() - 301
+            await pool.get_connection('b', 22, 'u', password='p')
+            return first.is_closed(), sorted(key[0] for key in pool.connections)
+
+    first_closed, hosts = run(scenario())
+    assert first_closed
+    assert hosts == ['b']
+
+
+def test_open_session_is_never_evicted(fake_asyncssh):
+    async def scenario():
+        async with AsyncConnectionPool(max_connections=1, max_idle_time=300) as pool:
+            async with pool.get_process_context('a', 22, 'u', 'true', password='p'):
+                info = pool.get_connection_info('a', 22, 'u')
+                info.last_used = time.monotonic() - 301
+                pool._cleanup_idle_connections()
+                pool._cleanup_idle_connections(count=1)
+                busy_closed = info.conn.is_closed()
+            return busy_closed, info.open_sessions
+
+    busy_closed, open_sessions = run(scenario())
+    assert not busy_closed
+    assert open_sessions == 0
+
+
+def test_close_connection_removes_it(fake_asyncssh):
+    async def scenario():
+        async with AsyncConnectionPool() as pool:
+            conn = await pool.get_connection('a', 22, 'u', password='p')
+            pool.close_connection('a', 22, 'u')
+            return conn.is_closed(), pool.list_connections()
+
+    closed, remaining = run(scenario())
+    assert closed
+    assert remaining == []
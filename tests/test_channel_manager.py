@@ -0,0 +1,129 @@
+"""
+Tests for ChannelManager's command framing and shell state tracking.
+"""
+
+import pytest
+
+from ztw_manager.channel_manager import (
+    ChannelCommand, ChannelManager, _compile_expect_patterns, _exit_code_marker
+)
+
+# Author: Vamsi
+
+
+@pytest.fixture
+def manager():
+    """ChannelManager without a connection; only its bookkeeping is exercised."""
+    return ChannelManager(None)
+
+
+def marker_output(marker: bytes, status: int) -> str:
+    """What the shell prints for a marker line sent after a command."""
+    line = marker.decode().strip()
+    return line[len('echo '):].replace('$?', str(status)) + '\r\n'
+
+
+def test_marker_nonces_are_unique():
+    (first, first_re), (second, second_re) = _exit_code_marker(), _exit_code_marker()
+    assert first != second
+    assert first_re.search(marker_output(first, 0))
+    assert not second_re.search(marker_output(first, 0))
+
+
+def test_extract_exit_code_strips_marker(manager):
+    marker, end_regex = _exit_code_marker()
+    output = 'line one\nline two\n' + marker_output(marker, 3)
+    exit_code, text = manager._extract_exit_code(output, end_regex)
+    assert exit_code == 3
+    assert text == 'line one\nline two\n'
+
+
+def test_extract_exit_code_ignores_earlier_markers(manager):
+    stale, _ = _exit_code_marker()
+    marker, end_regex = _exit_code_marker()
+    output = marker_output(stale, 1) + 'out\n' + marker_output(marker, 0)
+    exit_code, text = manager._extract_exit_code(output, end_regex)
+    assert exit_code == 0
+    assert text == marker_output(stale, 1) + 'out\n'
+
+
+def test_extract_exit_code_without_marker(manager):
+    _, end_regex = _exit_code_marker()
+    assert manager._extract_exit_code('still running', end_regex) == (None, 'still running')
+
+
+def test_wire_groups_command_only_with_marker():
+    assert ChannelCommand('ls &', capture_exit_code=True)._wire == b'{ ls &\n}; '
+    assert ChannelCommand('ls &')._wire == b'ls &\n'
+
+
+def test_expect_patterns_combined():
+    patterns = _compile_expect_patterns(['password:', 'continue\\?'])
+    assert patterns.combined is not None
+    index, match = patterns.search('Are you sure you want to CONTINUE? Password:')
+    assert index == 1
+    assert match.group() == 'CONTINUE?'
+
+
+def test_expect_patterns_with_groups_searched_separately():
+    patterns = _compile_expect_patterns([r'(a)\1', 'b'])
+    assert patterns.combined is None
+    index, match = patterns.search('xxbaa')
+    assert index == 1
+    assert match.start() == 2
+    assert patterns.search('xyz') is None
+
+
+def test_no_expect_patterns():
+    assert _compile_expect_patterns([]) is None
+
+
+@pytest.mark.parametrize('command, expected', [
+    ('cd /var/log', '/var/log'),
+    ('cd ..', '/'),
+    ('cd "my dir"', '/tmp/my dir'),
+    ("cd -P -- 'a b'/../c", '/tmp/c'),
+    ('cd', '~'),
+    ('cd ~/src', '~/src'),
+    ('cd ~other/src/', '~other/src'),
+    ('cd ~/a/../..', '~/..'),
+])
+def test_update_current_directory(manager, command, expected):
+    manager.current_directory['h'] = '/tmp'
+    manager._update_current_directory('h', command)
+    assert manager.current_directory['h'] == expected
+    assert manager.previous_directory['h'] == '/tmp'
+
+
+def test_cd_dash_returns_to_previous_directory(manager):
+    manager.current_directory['h'] = '/tmp'
+    manager._update_current_directory('h', 'cd /var')
+    manager._update_current_directory('h', 'cd -')
+    assert manager.current_directory['h'] == '/tmp'
+    assert manager.previous_directory['h'] == '/var'
+
+
+def test_relative_cd_from_home(manager):
+    manager._update_current_directory('h', 'cd src')
+    assert manager.current_directory['h'] == '~/src'
+    manager._update_current_directory('h', 'cd ../..')
+    assert manager.current_directory['h'] == '~/..'
+
+
+@pytest.mark.parametrize('directory, expected', [
+    ('~', ''),
+    ('/tmp/my dir', "cd '/tmp/my dir' || exit"),
+    ('~/my dir', "cd ~/'my dir' || exit"),
+    ('~other', 'cd ~other || exit'),
+    ('~other/src', 'cd ~other/src || exit'),
+    ('~$(x)/src', "cd '~$(x)/src' || exit"),
+])
+def test_cd_line(manager, directory, expected):
+    manager.current_directory['h'] = directory
+    assert manager._cd_line('h') == expected
+
+
+def test_unparseable_cd_keeps_directory(manager):
+    manager.current_directory['h'] = '/tmp'
+    manager._update_current_directory('h', 'cd "unterminated')
+    assert manager.current_directory['h'] == '/tmp'
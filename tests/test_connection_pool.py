@@ -0,0 +1,163 @@
+"""
+Tests for ConnectionPool's single-flight connects, retries and failed-connect backoff,
+with the SSH handshake replaced by an in-memory fake.
+"""
+
+import socket
+import threading
+import time
+import concurrent.futures
+from unittest import mock
+
+import pytest
+from paramiko.ssh_exception import NoValidConnectionsError, SSHException
+
+from ztw_manager import connection_pool
+from ztw_manager.connection_pool import (
+    ConnectionPool, FAILED_CONNECT_BACKOFF, LEGACY_ALGORITHMS
+)
+
+# Author: Vamsi
+
+
+class FakeTransport:
+    """Stand-in for paramiko.Transport."""
+
+    def __init__(self):
+        self.active = True
+
+    def is_active(self) -> bool:
+        return self.active
+
+    def is_authenticated(self) -> bool:
+        return True
+
+
+class FakeClient:
+    """Stand-in for a connected paramiko.SSHClient."""
+
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.closed = False
+
+    def get_transport(self):
+        return self.transport
+
+    def close(self):
+        self.closed = True
+        self.transport.active = False
+
+
+def refused() -> NoValidConnectionsError:
+    return NoValidConnectionsError({('h', 22): socket.error('refused')})
+
+
+@pytest.fixture
+def pool():
+    with ConnectionPool(health_check_interval=3600) as pool:
+        yield pool
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(connection_pool, 'CONNECT_BACKOFF', 0)
+
+
+def test_concurrent_callers_share_one_handshake(pool):
+    started = threading.Event()
+    release = threading.Event()
+
+    def connect_once(*args):
+        started.set()
+        release.wait(5)
+        return FakeClient()
+
+    with mock.patch.object(pool, '_connect_once', side_effect=connect_once) as connect:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(pool.get_connection, 'h', 22, 'u', 'p') for _ in range(8)]
+            started.wait(5)
+            # Let every caller reach the pending handshake before it completes
+            time.sleep(0.1)
+            release.set()
+            clients = [future.result(5) for future in futures]
+
+    assert connect.call_count == 1
+    assert all(client is clients[0] for client in clients)
+    assert pool.get_connection_info('h', 22, 'u').use_count == 8
+
+
+def test_waiters_get_the_owners_exception(pool):
+    release = threading.Event()
+
+    def connect_once(*args):
+        release.wait(5)
+        raise refused()
+
+    with mock.patch.object(pool, '_connect_once', side_effect=connect_once) as connect:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(pool.get_connection, 'h', 22, 'u', 'p') for _ in range(4)]
+            time.sleep(0.1)
+            release.set()
+            for future in futures:
+                with pytest.raises(NoValidConnectionsError):
+                    future.result(5)
+
+    assert connect.call_count == 1
+    assert not pool._pending
+
+
+def test_transient_failures_are_retried(pool):
+    attempts = [SSHException('banner'), SSHException('banner'), FakeClient()]
+    with mock.patch.object(pool, '_connect_once', side_effect=attempts) as connect:
+        client = pool.get_connection('h', 22, 'u', 'p')
+    assert connect.call_count == 3
+    assert client is attempts[2]
+
+
+def test_refused_connection_is_not_retried(pool):
+    with mock.patch.object(pool, '_connect_once', side_effect=refused()) as connect:
+        with pytest.raises(NoValidConnectionsError):
+            pool.get_connection('h', 22, 'u', 'p')
+    assert connect.call_count == 1
+
+
+def test_failed_key_is_refused_until_backoff_expires(pool):
+    key = ('h', 22, 'u')
+    with mock.patch.object(pool, '_connect_once', side_effect=refused()) as connect:
+        with pytest.raises(NoValidConnectionsError):
+            pool.get_connection('h', 22, 'u', 'p')
+        with pytest.raises(SSHException, match='recently failed'):
+            pool.get_connection('h', 22, 'u', 'p')
+        assert connect.call_count == 1
+        assert pool._blackhole[key][1] == FAILED_CONNECT_BACKOFF
+
+        # Once the backoff has passed the key is tried again, and a repeated
+        # failure doubles the backoff
+        pool._blackhole[key] = (time.monotonic() - 1, FAILED_CONNECT_BACKOFF)
+        with pytest.raises(NoValidConnectionsError):
+            pool.get_connection('h', 22, 'u', 'p')
+        assert connect.call_count == 2
+        assert pool._blackhole[key][1] == 2 * FAILED_CONNECT_BACKOFF
+
+    # Other keys are unaffected, and a success clears the entry
+    with mock.patch.object(pool, '_connect_once', return_value=FakeClient()):
+        pool.get_connection('other', 22, 'u', 'p')
+        pool._blackhole[key] = (time.monotonic() - 1, FAILED_CONNECT_BACKOFF)
+        pool.get_connection('h', 22, 'u', 'p')
+    assert key not in pool._blackhole
+
+
+def test_dead_connection_is_replaced(pool):
+    first, second = FakeClient(), FakeClient()
+    with mock.patch.object(pool, '_connect_once', side_effect=[first, second]):
+        assert pool.get_connection('h', 22, 'u', 'p') is first
+        first.transport.active = False
+        assert pool.get_connection('h', 22, 'u', 'p') is second
+    assert first.closed
+
+
+def test_legacy_algorithms_disabled_by_default():
+    with ConnectionPool(health_check_interval=3600) as pool:
+        assert pool.disabled_algorithms is LEGACY_ALGORITHMS
+    with ConnectionPool(health_check_interval=3600, allow_legacy_algorithms=True) as pool:
+        assert pool.disabled_algorithms is None
@@ -0,0 +1,123 @@
+"""
+Tests for IperfManager's output parsing, throughput statistics and result bookkeeping.
+"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from ztw_manager.iperf_manager import (
+    IperfManager, IperfTestConfig, IperfTestResult, _iperf_sections, _order_stats, _percentiles,
+    _throughput_stats
+)
+
+# Author: Vamsi
+
+PERCENTILES = [10, 25, 50, 75, 90, 99]
+
+IPERF_DOCUMENT = {
+    'start': {'connected': [{'socket': 5}], 'test_start': {'duration': 10}},
+    'intervals': [{'sum': {'bits_per_second': 9.1e9}}, {'sum': {'bits_per_second': 9.3e9}}],
+    'end': {'sum_sent': {'bits_per_second': 9.2e9}, 'sum_received': {'bits_per_second': 9.1e9}},
+}
+
+
+def iperf_json(document) -> str:
+    """Serialize like iperf3 -J: one tab per nesting level."""
+    return json.dumps(document, indent='\t')
+
+
+def test_sections_decodes_requested_members():
+    sections = _iperf_sections(iperf_json(IPERF_DOCUMENT), ('end', 'start'))
+    assert sections == {'end': IPERF_DOCUMENT['end'], 'start': IPERF_DOCUMENT['start']}
+
+
+def test_sections_ignores_nested_keys_and_leading_noise():
+    document = {'intervals': [{'end': 1}], 'end': {'sum_sent': {}}}
+    text = 'iperf3: warning\n' + iperf_json(document) + '\ntrailing text'
+    assert _iperf_sections(text, ('end',)) == {'end': {'sum_sent': {}}}
+
+
+def test_sections_optional_keys_may_be_missing():
+    text = iperf_json({'end': {}})
+    assert _iperf_sections(text, ('end', 'start')) == {'end': {}}
+
+
+def test_sections_without_required_key():
+    assert _iperf_sections(json.dumps(IPERF_DOCUMENT), ('end',)) is None
+    assert _iperf_sections(iperf_json({'start': {}}), ('end', 'start')) is None
+
+
+def test_sections_truncated_member():
+    text = iperf_json(IPERF_DOCUMENT)
+    with pytest.raises(json.JSONDecodeError):
+        _iperf_sections(text[:text.index('"sum_received"')], ('end',))
+
+
+@pytest.mark.parametrize('size', [1, 2, 7, 100, 1001])
+def test_percentiles_match_numpy(size):
+    values = np.random.default_rng(size).normal(5000, 800, size)
+    expected = np.percentile(values, PERCENTILES)
+    np.testing.assert_allclose(_percentiles(values.copy(), PERCENTILES), expected)
+
+
+@pytest.mark.parametrize('size', [1, 2, 7, 100, 1001])
+def test_order_stats_match_numpy(size):
+    values = np.random.default_rng(size).normal(5000, 800, size)
+    ranks = np.asarray(PERCENTILES, dtype=np.float64) / 100 * (size - 1)
+    mean, stats = _order_stats(values.copy(), ranks)
+    assert mean == pytest.approx(values.mean())
+    np.testing.assert_allclose(stats, np.percentile(values, PERCENTILES))
+
+
+def test_order_stats_with_duplicates():
+    values = np.array([3.0, 1.0, 3.0, 3.0, 2.0, 1.0, 3.0])
+    ranks = np.asarray(PERCENTILES, dtype=np.float64) / 100 * (values.size - 1)
+    _, stats = _order_stats(values.copy(), ranks)
+    np.testing.assert_allclose(stats, np.percentile(values, PERCENTILES))
+
+
+def test_throughput_stats():
+    values = np.arange(1.0, 11.0)
+    mean, stats = _throughput_stats(values.copy(), PERCENTILES)
+    assert mean == 5.5
+    np.testing.assert_allclose(stats, np.percentile(values, PERCENTILES))
+
+
+def make_result(success=True, bandwidth=0.0, test_type='client') -> IperfTestResult:
+    now = datetime.now()
+    return IperfTestResult(
+        client_host='c', server_host='s', test_type=test_type, command='iperf3', output='',
+        error='', start_time=now, end_time=now, duration=1.0, success=success,
+        metrics={'bandwidth_received_mbps': bandwidth}
+    )
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """IperfManager with two retained results and no SSH manager."""
+    return IperfManager(None, IperfTestConfig(output_dir=str(tmp_path), max_retained_results=2))
+
+
+def test_record_result_totals(manager):
+    manager._record_result(make_result(bandwidth=100))
+    manager._record_result(make_result(success=False))
+    summary = manager.get_test_summary()
+    assert summary['total_tests'] == 2
+    assert summary['successful_tests'] == 1
+    assert summary['average_bandwidth_mbps'] == 100
+
+
+def test_record_result_backs_out_evicted_results(manager):
+    manager._record_result(make_result(bandwidth=100))
+    manager._record_result(make_result(bandwidth=300))
+    manager._record_result(make_result(success=False))
+    manager._record_result(make_result(test_type='server'))
+    summary = manager.get_test_summary()
+    assert len(manager.test_results) == 2
+    assert summary['total_tests'] == 2
+    assert summary['successful_tests'] == 1
+    assert summary['average_bandwidth_mbps'] == 0
+    assert manager._summary_stats['bw_sum'] == 0.0
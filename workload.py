@@ -637,6 +637,8 @@ class HostWorkload:
                 'server_host': target_host,
                 'protocol': protocol_str
             }
+        finally:
+            iperf_manager.close()
 
 
 class WorkloadManager:
@@ -45,10 +45,10 @@ from .traffic_manager import (
     ProtocolType, Direction, LatencyMetrics, ThroughputMetrics,
     PacketMetrics, ConnectionMetrics, ProtocolSpecificMetrics
 )
-from .iperf_manager import IperfManager, IperfTestConfig, IperfTestResult
+from .iperf_manager import IperfManager, IperfTestConfig, IperfTestResult, IperfTransferError
 from .log_capture import LogCapture, LogCaptureConfig, LogEntry
 from .connection_pool import ConnectionPool, JumphostConnectionPool, ConnectionInfo
-from .channel_manager import ChannelManager, ChannelCommand, ChannelResult
+from .channel_manager import ChannelManager, ChannelCommand, ChannelResult, ChannelInfo
 
 __version__ = "1.0.0"
 __email__ = "vamsi@example.com"
@@ -60,8 +60,8 @@ __all__ = [
     'TrafficTestConfig', 'TrafficTestResult', 'ProtocolType',
     'Direction', 'LatencyMetrics', 'ThroughputMetrics',
     'PacketMetrics', 'ConnectionMetrics', 'ProtocolSpecificMetrics',
-    'IperfManager', 'IperfTestConfig', 'IperfTestResult',
+    'IperfManager', 'IperfTestConfig', 'IperfTestResult', 'IperfTransferError',
     'LogCapture', 'LogCaptureConfig', 'LogEntry',
     'ConnectionPool', 'JumphostConnectionPool', 'ConnectionInfo',
-    'ChannelManager', 'ChannelCommand', 'ChannelResult'
+    'ChannelManager', 'ChannelCommand', 'ChannelResult', 'ChannelInfo'
 ] 
\ No newline at end of file
@@ -0,0 +1,400 @@
+"""
+Async Connection Pool for ZTWorkload Manager
+asyncio-native SSH connection pooling on asyncssh, so one event loop thread
+can drive many concurrent sessions instead of one blocked thread per session.
+
+asyncssh is only needed by this module; the rest of the package runs
+without it.
+"""
+
+import time
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime
+from contextlib import asynccontextmanager
+
+try:
+    import asyncssh
+except ImportError:  # only AsyncConnectionPool needs it
+    asyncssh = None
+
+from .connection_pool import ConnectionKey, MAX_SESSIONS, KEEPALIVE_INTERVAL, HEALTH_CHECK_WORKERS
+
+# Author: Vamsi
+
+
+@dataclass(slots=True)
+class AsyncConnectionInfo:
+    """Information about a pooled asyncssh connection."""
+    host: str
+    port: int
+    user: str
+    conn: 'asyncssh.SSHClientConnection'
+    created_at: datetime
+    last_used: float  # time.monotonic() timestamp
+    use_count: int = 0
+    is_active: bool = True
+    error_count: int = 0
+    last_error: Optional[str] = None
+    session_slots: Optional[asyncio.Semaphore] = field(default=None, repr=False)
+    open_sessions: int = 0  # open get_process_context/get_connection_context blocks
+
+
+class AsyncConnectionPool:
+    """Manages a pool of asyncssh connections with automatic cleanup."""
+
+    def __init__(self,
+                 max_connections: int = 50,
+                 max_idle_time: int = 300,
+                 connection_timeout: int = 30,
+                 health_check_interval: int = 60,
+                 max_sessions: int = MAX_SESSIONS,
+                 keepalive_interval: int = KEEPALIVE_INTERVAL):
+        """
+        Initialize async connection pool.
+
+        The health check task starts on first use, inside the running loop.
+
+        :param max_connections: Maximum number of connections in pool
+        :param max_idle_time: Maximum idle time in seconds
+        :param connection_timeout: Connection timeout in seconds
+        :param health_check_interval: Health check interval in seconds
+        :param max_sessions: Maximum concurrent sessions handed out per connection
+        :param keepalive_interval: SSH keepalive interval in seconds (0 disables)
+        :raises ImportError: If asyncssh is not installed
+        """
+        if asyncssh is None:
+            raise ImportError("AsyncConnectionPool requires asyncssh (pip install asyncssh)")
+        self.max_connections = max_connections
+        self.max_idle_time = max_idle_time
+        self.connection_timeout = connection_timeout
+        self.health_check_interval = health_check_interval
+        self.max_sessions = max_sessions
+        self.keepalive_interval = keepalive_interval
+
+        # Everything runs on one loop, so plain dicts need no locking
+        self.connections: Dict[ConnectionKey, AsyncConnectionInfo] = {}
+
+        # Connections being opened; callers for the same key await the
+        # same future instead of starting their own handshake
+        self._pending: Dict[ConnectionKey, asyncio.Future] = {}
+
+        self._health_check_task: Optional[asyncio.Task] = None
+
+    async def _create_connection(self, host: str, port: int, user: str,
+                                 password: str = None, key_file: str = None) -> 'asyncssh.SSHClientConnection':
+        """
+        Create a new SSH connection.
+
+        :param host: Host name
+        :param port: Port number
+        :param user: Username
+        :param password: Password
+        :param key_file: Key file path
+        :return: asyncssh client connection
+        """
+        if key_file:
+            auth = {'client_keys': [key_file]}
+        elif password:
+            auth = {'password': password, 'client_keys': None}
+        else:
+            raise ValueError("Either password or key_file must be provided")
+
+        # known_hosts=None matches the AutoAddPolicy used by the threaded pool
+        return await asyncssh.connect(
+            host,
+            port=port,
+            username=user,
+            known_hosts=None,
+            connect_timeout=self.connection_timeout,
+            login_timeout=60,
+            keepalive_interval=self.keepalive_interval,
+            **auth
+        )
+
+    async def get_connection(self, host: str, port: int, user: str,
+                             password: str = None, key_file: str = None) -> 'asyncssh.SSHClientConnection':
+        """
+        Get a connection from the pool or create a new one.
+
+        :param host: Host name
+        :param port: Port number
+        :param user: Username
+        :param password: Password
+        :param key_file: Key file path
+        :return: asyncssh client connection
+        """
+        conn_info = await self._get_connection_info(host, port, user, password, key_file)
+        return conn_info.conn
+
+    async def _get_connection_info(self, host: str, port: int, user: str,
+                                   password: str = None, key_file: str = None) -> AsyncConnectionInfo:
+        """
+        Get a pooled connection's information, creating the connection if needed.
+
+        :param host: Host name
+        :param port: Port number
+        :param user: Username
+        :param password: Password
+        :param key_file: Key file path
+        :return: Connection information
+        """
+        self._ensure_health_check()
+        connection_key = (host, port, user)
+
+        conn_info = self.connections.get(connection_key)
+        if conn_info is not None:
+            if not conn_info.conn.is_closed():
+                conn_info.last_used = time.monotonic()
+                conn_info.use_count += 1
+                return conn_info
+            self._remove_connection(connection_key)
+
+        # Join a handshake already in flight for this key
+        pending = self._pending.get(connection_key)
+        if pending is not None:
+            conn_info = await asyncio.shield(pending)
+            conn_info.last_used = time.monotonic()
+            conn_info.use_count += 1
+            return conn_info
+
+        pending = self._pending[connection_key] = asyncio.get_running_loop().create_future()
+        try:
+            # Check pool size limit; only idle connections are evicted, so
+            # the pool may exceed it while all of them are recently used
+            if len(self.connections) >= self.max_connections:
+                self._cleanup_idle_connections(count=1)
+
+            conn = await self._create_connection(host, port, user, password, key_file)
+
+            conn_info = AsyncConnectionInfo(
+                host=host,
+                port=port,
+                user=user,
+                conn=conn,
+                created_at=datetime.now(),
+                last_used=time.monotonic(),
+                use_count=1,
+                session_slots=asyncio.Semaphore(self.max_sessions)
+            )
+            self.connections[connection_key] = conn_info
+            pending.set_result(conn_info)
+            return conn_info
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except BaseException as e:
+            pending.set_exception(e)
+            # Mark it retrieved so an unawaited future doesn't log a warning
+            pending.exception()
+            raise
+        finally:
+            del self._pending[connection_key]
+
+    def return_connection(self, host: str, port: int, user: str):
+        """
+        Return a connection to the pool (no-op for now, connections are reused).
+
+        :param host: Host name
+        :param port: Port number
+        :param user: Username
+        """
+        pass
+
+    def close_connection(self, host: str, port: int, user: str):
+        """
+        Close a specific connection.
+
+        :param host: Host name
+        :param port: Port number
+        :param user: Username
+        """
+        self._remove_connection((host, port, user))
+
+    def _remove_connection(self, connection_key: ConnectionKey,
+                           expected: AsyncConnectionInfo = None) -> Optional[AsyncConnectionInfo]:
+        """
+        Remove a connection from the pool and close it.
+
+        :param connection_key: Connection key
+        :param expected: Only remove if the pooled entry is still this one
+        :return: The removed connection information, or None
+        """
+        conn_info = self.connections.get(connection_key)
+        if conn_info is None or (expected is not None and conn_info is not expected):
+            return None
+        del self.connections[connection_key]
+        conn_info.is_active = False
+        conn_info.conn.close()
+        return conn_info
+
+    async def _test_connection(self, conn: 'asyncssh.SSHClientConnection') -> bool:
+        """
+        Test if a connection is still active.
+
+        :param conn: Connection to test
+        :return: True if connection is active
+        """
+        if conn.is_closed():
+            return False
+        if self.keepalive_interval:
+            # Keepalives already close connections to dead peers
+            return True
+        try:
+            result = await conn.run("echo 'test'", check=False, timeout=5)
+            return result.exit_status == 0
+        except (asyncssh.Error, OSError, asyncio.TimeoutError):
+            return False
+
+    def _cleanup_idle_connections(self, count: int = None):
+        """
+        Clean up idle connections.
+
+        Only connections idle longer than max_idle_time and without open
+        sessions are closed, as in the threaded pool; a connection handed out
+        by get_connection() may still be in use by its caller until then.
+
+        :param count: Close only the `count` least recently used idle connections
+        """
+        now = time.monotonic()
+        idle = [(key, info) for key, info in self.connections.items()
+                if info.open_sessions == 0 and now - info.last_used > self.max_idle_time]
+        if count is not None:
+            idle = sorted(idle, key=lambda item: item[1].last_used)[:count]
+        for key, conn_info in idle:
+            self._remove_connection(key, expected=conn_info)
+
+    def _ensure_health_check(self):
+        """Start the health check task on the running loop if it isn't running."""
+        if self._health_check_task is None or self._health_check_task.done():
+            self._health_check_task = asyncio.get_running_loop().create_task(self._health_check_loop())
+
+    async def _health_check_loop(self):
+        """Health check task; probes run concurrently, bounded by a semaphore."""
+        limit = asyncio.Semaphore(HEALTH_CHECK_WORKERS)
+
+        async def probe(conn_info: AsyncConnectionInfo) -> bool:
+            async with limit:
+                return await self._test_connection(conn_info.conn)
+
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                self._cleanup_idle_connections()
+
+                snapshot = list(self.connections.items())
+                results = await asyncio.gather(*(probe(info) for _, info in snapshot))
+                for (key, conn_info), healthy in zip(snapshot, results):
+                    if not healthy:
+                        conn_info.error_count += 1
+                        self._remove_connection(key, expected=conn_info)
+            except Exception:
+                # Keep checking on the next interval
+                pass
+
+    async def stop_health_check(self):
+        """Stop the health check task."""
+        task = self._health_check_task
+        self._health_check_task = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def get_connection_info(self, host: str, port: int, user: str) -> Optional[AsyncConnectionInfo]:
+        """
+        Get information about a connection.
+
+        :param host: Host name
+        :param port: Port number
+        :param user: Username
+        :return: Connection information or None
+        """
+        return self.connections.get((host, port, user))
+
+    def list_connections(self) -> List[Tuple[ConnectionKey, AsyncConnectionInfo]]:
+        """
+        List all connections in the pool.
+
+        :return: List of (key, connection_info) tuples
+        """
+        return list(self.connections.items())
+
+    async def clear_pool(self):
+        """Clear all connections from the pool and wait for them to close."""
+        connections = list(self.connections.values())
+        self.connections.clear()
+        for conn_info in connections:
+            conn_info.is_active = False
+            conn_info.conn.close()
+        await asyncio.gather(*(info.conn.wait_closed() for info in connections),
+                             return_exceptions=True)
+
+    @asynccontextmanager
+    async def get_connection_context(self, host: str, port: int, user: str,
+                                     password: str = None, key_file: str = None):
+        """
+        Async context manager for getting a connection.
+
+        :param host: Host name
+        :param port: Port number
+        :param user: Username
+        :param password: Password
+        :param key_file: Key file path
+        :yield: asyncssh client connection
+        """
+        conn_info = await self._get_connection_info(host, port, user, password, key_file)
+        # Held for the block, so eviction leaves it alone like an open process
+        conn_info.open_sessions += 1
+        try:
+            yield conn_info.conn
+        finally:
+            conn_info.open_sessions -= 1
+            conn_info.last_used = time.monotonic()
+            self.return_connection(host, port, user)
+
+    @asynccontextmanager
+    async def get_process_context(self, host: str, port: int, user: str,
+                                  command: str = None, password: str = None,
+                                  key_file: str = None, **process_kwargs):
+        """
+        Async context manager for a session process on a pooled connection.
+
+        Counterpart of ConnectionPool.get_channel_context: at most
+        max_sessions processes are open per connection, and further callers
+        wait for a free slot.
+
+        :param host: Host name
+        :param port: Port number
+        :param user: Username
+        :param command: Command to run, or None for an interactive shell
+        :param password: Password
+        :param key_file: Key file path
+        :param process_kwargs: Extra arguments for SSHClientConnection.create_process
+        :yield: SSHClientProcess, closed on exit
+        """
+        conn_info = await self._get_connection_info(host, port, user, password, key_file)
+        try:
+            await asyncio.wait_for(conn_info.session_slots.acquire(), self.connection_timeout)
+        except asyncio.TimeoutError:
+            raise asyncssh.ChannelOpenError(
+                asyncssh.OPEN_RESOURCE_SHORTAGE,
+                f"No free session on {host}:{port} after {self.connection_timeout}s")
+        conn_info.open_sessions += 1
+        try:
+            async with conn_info.conn.create_process(command, **process_kwargs) as process:
+                yield process
+        finally:
+            conn_info.open_sessions -= 1
+            conn_info.last_used = time.monotonic()
+            conn_info.session_slots.release()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop_health_check()
+        await self.clear_pool()
@@ -4,11 +4,19 @@ Manages SSH channels for interactive command execution and complex workflows.
 """
 
 import time
+import select
+import selectors
+import socket
 import threading
 import re
-from typing import List, Dict, Optional, Any, Tuple
+import codecs
+import itertools
+import shlex
+import posixpath
+import concurrent.futures
+from typing import List, Dict, Optional, Any, Tuple, Union, Pattern, Match
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from paramiko import SSHClient, Channel
 from paramiko.ssh_exception import SSHException
 
@@ -16,8 +24,230 @@ from .logger import StructuredLogger
 
 # Author: Vamsi
 
+# Kernel send/receive buffer size requested for the transport socket
+SOCKET_BUFFER_SIZE = 32 << 20
 
-@dataclass
+# Default read size for channel.recv(), one full SSH packet or more
+RECV_SIZE = 1 << 16
+
+# Output kept per command before the command is interrupted
+MAX_OUTPUT_BYTES = 16 << 20
+
+# Appended to output cut off at the max_output_bytes limit
+OUTPUT_TRUNCATED_NOTICE = '\n[output truncated]\n'
+
+# Largest single read used when discarding stale channel output
+CLEAN_RECV_SIZE = 1 << 20
+
+# Number of trailing output characters scanned for the shell prompt
+PROMPT_SCAN_WINDOW = 512
+
+# Number of trailing output characters scanned for expect patterns
+EXPECT_SCAN_WINDOW = 4096
+
+# Already-scanned characters rescanned with new output, so a match split
+# across reads is still found (longer matches may be missed)
+EXPECT_SCAN_OVERLAP = 256
+
+# Bytes that can hold EXPECT_SCAN_WINDOW characters (UTF-8 is at most 4 bytes each)
+EXPECT_SCAN_BYTES = EXPECT_SCAN_WINDOW * 4
+
+# Echoed after each command of a batched chain with its index and exit status
+CHAIN_END_MARKER = 'echo __VWT_CMDEND_{}_${{__vwt_rc}}__'
+CHAIN_END_RE = re.compile(r'__VWT_CMDEND_(\d+)_(\d+)__\r?\n?')
+
+# Tilde prefix ('~' or '~user') of a tracked directory, left unquoted in
+# replayed cd commands so the shell expands it
+TILDE_PREFIX_RE = re.compile(r'~[\w.-]*')
+
+# Minimum seconds between sweeps for closed or idle channels
+CHANNEL_SWEEP_INTERVAL = 60.0
+
+# Upper bound on concurrent chains in execute_chain_commands_multi
+MAX_CHAIN_WORKERS = 32
+
+# Echoed after a shell command with a per-execution nonce and its exit
+# status; the nonce keeps a late marker from an earlier command that timed
+# out from ending the next one
+EXIT_CODE_MARKER = 'echo __VWT_RC_{}_$?__'
+EXIT_CODE_RE = r'__VWT_RC_{}_(\d+)__\r?\n?'
+
+# Source of exit status marker nonces, unique within the process
+_marker_ids = itertools.count()
+
+
+def _exit_code_marker() -> Tuple[bytes, Pattern]:
+    """
+    Build a fresh exit status marker line and the regex that matches its output.
+    
+    :return: Tuple of (marker line to send, compiled marker regex)
+    """
+    nonce = next(_marker_ids)
+    return (f"{EXIT_CODE_MARKER.format(nonce)}\n".encode('utf-8'),
+            re.compile(EXIT_CODE_RE.format(nonce)))
+
+
+def _normalize_tracked_path(path: str) -> str:
+    """
+    Normalize a tracked directory, keeping a leading '~' or '~user' prefix as
+    the base that '..' components are resolved against.
+    
+    :param path: Absolute or tilde-prefixed POSIX path
+    :return: Normalized path
+    """
+    if not path.startswith('~'):
+        return posixpath.normpath(path)
+    prefix, _, rest = path.partition('/')
+    rest = posixpath.normpath(rest) if rest else '.'
+    return prefix if rest == '.' else f"{prefix}/{rest}"
+
+
+def _decode_chunks(chunks: List[bytes], encoding: str) -> str:
+    """
+    Join raw byte chunks and decode them in a single pass.
+    
+    :param chunks: Byte chunks received from a channel
+    :param encoding: Output encoding
+    :return: Decoded text
+    """
+    return b''.join(chunks).decode(encoding, errors='ignore')
+
+
+class _ExpectPatterns:
+    """Case-insensitive expect patterns, searched in a single pass where possible."""
+    __slots__ = ('combined', 'compiled')
+    
+    def __init__(self, patterns: List[str]):
+        """
+        Compile expect patterns.
+        
+        Patterns are combined into one alternation, each wrapped in a named
+        group ``p<index>``, unless a pattern has its own groups or inline
+        flags; wrapping would renumber its backreferences or misplace the
+        flags, so such sets are searched pattern by pattern instead.
+        
+        :param patterns: Expect patterns (regular expressions)
+        """
+        self.compiled = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+        self.combined = None
+        if all(regex.groups == 0 for regex in self.compiled):
+            try:
+                self.combined = re.compile(
+                    '|'.join(f'(?P<p{i}>{pattern})' for i, pattern in enumerate(patterns)),
+                    re.IGNORECASE
+                )
+            except re.error:
+                pass
+    
+    def search(self, text: str, pos: int = 0) -> Optional[Tuple[int, Match]]:
+        """
+        Find the earliest expect pattern match.
+        
+        :param text: Text to search
+        :param pos: Position to start searching at
+        :return: Tuple of (pattern index, match), or None
+        """
+        if self.combined is not None:
+            match = self.combined.search(text, pos)
+            return (int(match.lastgroup[1:]), match) if match else None
+        best = None
+        for index, regex in enumerate(self.compiled):
+            match = regex.search(text, pos)
+            if match and (best is None or match.start() < best[1].start()):
+                best = (index, match)
+        return best
+
+
+def _compile_expect_patterns(patterns: List[str]) -> Optional[_ExpectPatterns]:
+    """
+    Compile expect patterns for searching in a single pass.
+    
+    :param patterns: Expect patterns (regular expressions)
+    :return: Compiled patterns or None if there are no patterns
+    """
+    if not patterns:
+        return None
+    return _ExpectPatterns(patterns)
+
+
+def _fetch_plain(channel: Channel, selector: Optional[selectors.BaseSelector], recv_size: int,
+                 end_regex: Pattern, timeout: float, max_output_bytes: int) -> Tuple[str, str]:
+    """
+    Read loop for commands that only wait for the exit status marker.
+    
+    :param channel: SSH channel
+    :param selector: Selector the channel is registered with (None to wait with select())
+    :param recv_size: Bytes requested per read
+    :param end_regex: Regex for the command's exit status marker
+    :param timeout: Timeout in seconds
+    :param max_output_bytes: Interrupt the command (Ctrl-C) once its output exceeds this size
+    :return: Tuple of (output, error)
+    """
+    search_end = end_regex.search
+    monotonic = time.monotonic
+    output_chunks: List[bytes] = []
+    error_chunks: List[bytes] = []
+    # The marker is short, so only a little trailing text is kept for matching
+    tail = ""
+    finished = False
+    output_size = 0
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    recv_ready = channel.recv_ready
+    recv = channel.recv
+    stderr_ready = channel.recv_stderr_ready
+    recv_stderr = channel.recv_stderr
+    exit_ready = channel.exit_status_ready
+    deadline = monotonic() + timeout
+    
+    try:
+        while True:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                break
+            if selector is not None:
+                readable = selector.select(remaining)
+            else:
+                readable, _, _ = select.select([channel], [], [], remaining)
+            
+            out_ready = readable and recv_ready()
+            err_ready = readable and stderr_ready()
+            if not (out_ready or err_ready):
+                if exit_ready() or channel.eof_received:
+                    break
+                continue
+            
+            while out_ready:
+                data = recv(recv_size)
+                if not data:
+                    break
+                output_size += len(data)
+                if max_output_bytes and output_size > max_output_bytes:
+                    output_chunks.append(data[:len(data) - (output_size - max_output_bytes)])
+                    channel.send(b'\x03')
+                    output = _decode_chunks(output_chunks, 'utf-8') + OUTPUT_TRUNCATED_NOTICE
+                    return output, _decode_chunks(error_chunks, 'utf-8')
+                output_chunks.append(data)
+                window = tail + decoder.decode(data)
+                finished = finished or search_end(window) is not None
+                tail = window[-EXPECT_SCAN_OVERLAP:]
+                out_ready = len(data) == recv_size and recv_ready()
+            while err_ready:
+                data = recv_stderr(recv_size)
+                if not data:
+                    break
+                error_chunks.append(data)
+                err_ready = len(data) == recv_size and stderr_ready()
+            
+            if finished:
+                break
+        
+        return _decode_chunks(output_chunks, 'utf-8'), _decode_chunks(error_chunks, 'utf-8')
+    
+    except Exception as e:
+        return _decode_chunks(output_chunks, 'utf-8'), str(e)
+
+
+@dataclass(slots=True)
 class ChannelCommand:
     """Represents a command to be executed on a channel."""
     command: str
@@ -27,9 +257,35 @@ class ChannelCommand:
     wait_for_prompt: bool = False
     prompt_pattern: str = r'[\$#]\s*$'
     clean_channel: bool = False
+    max_output_bytes: int = MAX_OUTPUT_BYTES
+    use_exec: bool = False
+    # Follow the command with an exit status marker; only for commands run
+    # by a POSIX shell, not input typed into a program running on the channel
+    capture_exit_code: bool = False
+    # Compiled and encoded once here so repeated executions skip the work
+    _compiled_prompt: Optional[Pattern] = field(default=None, init=False, repr=False, compare=False)
+    _expect_regex: Optional[_ExpectPatterns] = field(default=None, init=False, repr=False, compare=False)
+    _wire: bytes = field(default=b'', init=False, repr=False, compare=False)
+    _response_lines: Dict[str, bytes] = field(default_factory=dict, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if self.wait_for_prompt:
+            self._compiled_prompt = re.compile(self.prompt_pattern)
+        self._expect_regex = _compile_expect_patterns(self.expect_patterns)
+        
+        if self.capture_exit_code:
+            # Group the command so a trailing '&', comment or heredoc
+            # terminator can't swallow the exit status marker sent after it
+            self._wire = f"{{ {self.command}\n}}; ".encode('utf-8')
+        else:
+            self._wire = f"{self.command}\n".encode('utf-8')
+        self._response_lines = {
+            pattern: (response + '\n').encode('utf-8')
+            for pattern, response in self.expect_responses.items() if response
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class ChannelResult:
     """Result of a channel command execution."""
     command: str
@@ -39,28 +295,113 @@ class ChannelResult:
     duration: float = 0.0
     timestamp: datetime = field(default_factory=datetime.now)
     success: bool = True
-    channel_state: Dict[str, Any] = field(default_factory=dict)
+    truncated: bool = False
+    timed_out: bool = False
+
+
+@dataclass(slots=True)
+class ChannelInfo:
+    """Bookkeeping for an open channel."""
+    type: str
+    created_at: datetime
+    last_used: float  # time.monotonic() timestamp
+    command_count: int = 0
+    is_active: bool = True
+    # Selector with the channel registered once for the channel's lifetime
+    selector: Optional[selectors.BaseSelector] = None
+    # The channel this record describes, so a replacement isn't mistaken for it
+    channel: Optional[Channel] = field(default=None, repr=False)
 
 
 class ChannelManager:
     """Manages SSH channels for interactive command execution."""
     
-    def __init__(self, ssh_client: SSHClient, logger=None):
+    def __init__(self, ssh_client: SSHClient, logger=None,
+                 window_size: int = 2 ** 22, max_packet_size: int = 2 ** 15,
+                 tcp_nodelay: bool = True, socket_buffer_size: Optional[int] = SOCKET_BUFFER_SIZE,
+                 rekey_bytes: Optional[int] = None, recv_size: int = RECV_SIZE,
+                 max_idle_seconds: Optional[float] = None):
         """
         Initialize channel manager.
         
         :param ssh_client: SSH client instance
         :param logger: Logger instance
+        :param window_size: SSH channel window size in bytes
+        :param max_packet_size: Maximum SSH packet size in bytes
+        :param tcp_nodelay: Disable Nagle's algorithm on the transport socket
+        :param socket_buffer_size: SO_SNDBUF/SO_RCVBUF size in bytes (None to keep the OS default)
+        :param rekey_bytes: Bytes transferred before the transport rekeys (None to keep paramiko's default)
+        :param recv_size: Bytes requested per channel read
+        :param max_idle_seconds: Close channels unused for this long (None to keep them open);
+                                 must exceed the longest single command
         """
         self.ssh_client = ssh_client
         self.logger = logger or StructuredLogger()
+        self.window_size = window_size
+        self.max_packet_size = max_packet_size
+        self.default_window_size = recv_size
         self.channels: Dict[str, Channel] = {}
-        self.channel_info: Dict[str, Dict[str, Any]] = {}
-        self.lock = threading.RLock()
+        self.channel_info: Dict[str, ChannelInfo] = {}
+        
+        # Per-host locks let commands on different hosts run in parallel;
+        # self.lock only guards the dicts themselves and is never re-entered
+        self.lock = threading.Lock()
+        self._host_locks: Dict[str, threading.Lock] = {}
         
         # Channel state tracking
         self.current_directory: Dict[str, str] = {}
+        self.previous_directory: Dict[str, str] = {}
         self.environment_vars: Dict[str, Dict[str, str]] = {}
+        
+        # Closed and idle channels are reaped lazily from get/create_channel
+        self.max_idle_seconds = max_idle_seconds
+        self._last_sweep = time.monotonic()
+        
+        self._tune_transport(tcp_nodelay, socket_buffer_size, rekey_bytes)
+    
+    def _tune_transport(self, tcp_nodelay: bool, socket_buffer_size: Optional[int],
+                        rekey_bytes: Optional[int]):
+        """
+        Apply socket and rekey settings to the client's transport.
+        
+        :param tcp_nodelay: Disable Nagle's algorithm
+        :param socket_buffer_size: Kernel send/receive buffer size in bytes
+        :param rekey_bytes: Bytes transferred before the transport rekeys
+        """
+        transport = self.ssh_client.get_transport() if self.ssh_client else None
+        if transport is None:
+            return
+        
+        # Through a jumphost or proxy command the transport runs over a
+        # channel rather than a TCP socket; only tune real sockets
+        sock = transport.sock
+        if isinstance(sock, socket.socket):
+            try:
+                if tcp_nodelay:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                if socket_buffer_size:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, socket_buffer_size)
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, socket_buffer_size)
+            except OSError as e:
+                self.logger.warning(f"Failed to set socket options: {e}")
+        
+        # Rekeying less often trades key freshness for bulk throughput,
+        # so it is opt-in
+        if rekey_bytes:
+            transport.packetizer.REKEY_BYTES = rekey_bytes
+    
+    def _host_lock(self, host: str) -> threading.Lock:
+        """
+        Get the lock for a host, creating it on first use.
+        
+        :param host: Host name
+        :return: Lock guarding the host's channel state
+        """
+        lock = self._host_locks.get(host)
+        if lock is None:
+            with self.lock:
+                lock = self._host_locks.setdefault(host, threading.Lock())
+        return lock
     
     def create_channel(self, host: str, channel_type: str = "shell") -> Channel:
         """
@@ -70,26 +411,42 @@ class ChannelManager:
         :param channel_type: Type of channel (shell, exec, etc.)
         :return: SSH channel
         """
-        with self.lock:
+        self._sweep_channels()
+        
+        with self._host_lock(host):
             try:
+                # Open the session with a large window so long outputs don't
+                # stall on window-adjust round-trips
+                transport = self.ssh_client.get_transport()
+                channel = transport.open_session(
+                    window_size=self.window_size,
+                    max_packet_size=self.max_packet_size
+                )
                 if channel_type == "shell":
-                    channel = self.ssh_client.invoke_shell()
-                else:
-                    channel = self.ssh_client.get_transport().open_session()
+                    channel.get_pty()
+                    channel.invoke_shell()
                 
                 # Configure channel
                 channel.settimeout(30)
                 channel.set_combine_stderr(True)
                 
-                # Store channel
+                # Register the channel once so reads wait on epoll/kqueue
+                selector = selectors.DefaultSelector()
+                selector.register(channel, selectors.EVENT_READ)
+                
+                # Store channel, closing any channel it replaces so that
+                # channel and its selector don't leak
+                previous = self.channels.pop(host, None)
+                if previous is not None:
+                    self._shutdown_channel(host, previous)
                 self.channels[host] = channel
-                self.channel_info[host] = {
-                    'type': channel_type,
-                    'created_at': datetime.now(),
-                    'last_used': datetime.now(),
-                    'command_count': 0,
-                    'is_active': True
-                }
+                self.channel_info[host] = ChannelInfo(
+                    type=channel_type,
+                    created_at=datetime.now(),
+                    last_used=time.monotonic(),
+                    selector=selector,
+                    channel=channel
+                )
                 
                 self.logger.info(f"Created {channel_type} channel for {host}")
                 return channel
@@ -105,15 +462,39 @@ class ChannelManager:
         :param host: Host name
         :return: SSH channel or None if not found
         """
+        self._sweep_channels()
+        
+        # dict.get is atomic, so the lookup itself needs no lock; usage
+        # stats are recorded by the commands themselves
+        channel = self.channels.get(host)
+        if channel and self._is_channel_active(channel):
+            return channel
+        return None
+    
+    def _sweep_channels(self):
+        """Close and forget channels that are closed or idle, at most once per sweep interval."""
+        now = time.monotonic()
+        if now - self._last_sweep < CHANNEL_SWEEP_INTERVAL:
+            return
+        
         with self.lock:
-            channel = self.channels.get(host)
-            if channel and self._is_channel_active(channel):
-                # Update last used time
-                if host in self.channel_info:
-                    self.channel_info[host]['last_used'] = datetime.now()
-                    self.channel_info[host]['command_count'] += 1
-                return channel
-            return None
+            # Another thread may have swept while we waited
+            if now - self._last_sweep < CHANNEL_SWEEP_INTERVAL:
+                return
+            self._last_sweep = now
+            
+            stale = []
+            for host, channel in list(self.channels.items()):
+                info = self.channel_info.get(host)
+                idle = self.max_idle_seconds is not None and info is not None and \
+                    now - info.last_used > self.max_idle_seconds
+                if channel.closed or idle:
+                    stale.append((host, self.channels.pop(host), info))
+        
+        # Host locks are not taken here, so sweeping from inside
+        # create_channel can't deadlock against another host
+        for host, channel, info in stale:
+            self._shutdown_channel(host, channel)
     
     def _is_channel_active(self, channel: Channel) -> bool:
         """
@@ -133,37 +514,84 @@ class ChannelManager:
         
         :param host: Host name
         """
-        with self.lock:
-            if host in self.channels:
-                try:
-                    channel = self.channels[host]
-                    if not channel.closed:
-                        channel.close()
-                    del self.channels[host]
-                    
-                    if host in self.channel_info:
-                        self.channel_info[host]['is_active'] = False
-                    
-                    self.logger.info(f"Closed channel for {host}")
-                except Exception as e:
-                    self.logger.error(f"Error closing channel for {host}: {e}")
+        with self._host_lock(host):
+            channel = self.channels.pop(host, None)
+            if channel is not None:
+                self._shutdown_channel(host, channel)
     
     def close_all_channels(self):
         """Close all channels."""
+        # Detach everything in one short critical section, then close
+        # outside the lock since closing may wait on the network
         with self.lock:
-            for host in list(self.channels.keys()):
-                self.close_channel(host)
+            channels = list(self.channels.items())
+            self.channels.clear()
+        if len(channels) <= 1:
+            for host, channel in channels:
+                self._shutdown_channel(host, channel)
+            return
+        
+        # Closing sends a message per channel, so overlap them
+        workers = min(MAX_CHAIN_WORKERS, len(channels))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for host, channel in channels:
+                executor.submit(self._shutdown_channel, host, channel)
+    
+    def _shutdown_channel(self, host: str, channel: Channel):
+        """
+        Close a channel that has already been removed from self.channels.
+        
+        The host's bookkeeping and tracked shell state are dropped with it,
+        unless they already belong to a channel that replaced this one.
+        
+        :param host: Host name
+        :param channel: SSH channel
+        """
+        try:
+            if not channel.closed:
+                channel.close()
+            
+            with self.lock:
+                info = self.channel_info.get(host)
+                owned = info is not None and info.channel is channel
+                if owned:
+                    # A new shell starts in the login directory, so the
+                    # tracked directories go with the old one
+                    del self.channel_info[host]
+                    self.current_directory.pop(host, None)
+                    self.previous_directory.pop(host, None)
+                    self.environment_vars.pop(host, None)
+            if owned:
+                info.is_active = False
+                info.channel = None
+                if info.selector is not None:
+                    info.selector.close()
+                    info.selector = None
+            
+            self.logger.info(f"Closed channel for {host}")
+        except Exception as e:
+            self.logger.error(f"Error closing channel for {host}: {e}")
     
     def execute_chain_commands(self, host: str, commands: List[ChannelCommand], 
-                              create_new_channel: bool = False) -> List[ChannelResult]:
+                              create_new_channel: bool = False, pipeline: bool = False,
+                              continue_on_error: bool = False) -> List[ChannelResult]:
         """
         Execute a chain of commands on a channel.
         
         :param host: Host name
         :param commands: List of commands to execute
         :param create_new_channel: Whether to create a new channel
+        :param pipeline: Run non-interactive chains as a single exec request (opt-in:
+                         the exec session has no pty and only inherits the tracked
+                         working directory, not the shell channel's environment)
+        :param continue_on_error: Keep running a pipelined chain after a command fails
         :return: List of command results
         """
+        # Opted-in non-interactive chains run as one exec request instead
+        # of a round-trip per command on the shell channel
+        if pipeline and self._is_simple_chain(commands):
+            return self._execute_batched_chain(host, commands, continue_on_error)
+        
         results = []
         
         # Get or create channel
@@ -175,8 +603,15 @@ class ChannelManager:
             if not channel:
                 channel = self.create_channel(host)
         
+        # Mark the channel busy so the idle sweep leaves it alone
+        info = self.channel_info.get(host)
+        if info is not None:
+            info.last_used = time.monotonic()
+        
+        executed = 0
         try:
             for cmd in commands:
+                executed += 1
                 result = self._execute_single_command(channel, cmd, host)
                 results.append(result)
                 
@@ -185,9 +620,6 @@ class ChannelManager:
                     self.logger.warning(f"Command failed on {host}, cleaning channel")
                     self._clean_channel_buffer(channel)
                 
-                # Small delay between commands
-                time.sleep(0.1)
-                
         except Exception as e:
             self.logger.error(f"Error executing chain commands on {host}: {e}")
             # Create error result
@@ -199,8 +631,242 @@ class ChannelManager:
             )
             results.append(error_result)
         
+        # Record last use and the command count per chain rather than per
+        # command; a channel runs one chain at a time, so its own info needs
+        # no manager-wide lock
+        info = self.channel_info.get(host)
+        if info is not None:
+            info.last_used = time.monotonic()
+            info.command_count += executed
+        
+        return results
+    
+    def execute_chain_commands_multi(self, hosts: Union[List[str], Dict[str, List[ChannelCommand]]],
+                                     commands: List[ChannelCommand] = None,
+                                     max_workers: int = None) -> Dict[str, List[ChannelResult]]:
+        """
+        Execute chains of commands on several channels concurrently.
+        
+        Each host gets its own channel on this manager's connection; paramiko
+        releases the GIL while waiting on the network, so the chains overlap.
+        
+        :param hosts: Host names identifying the channels, or a mapping of
+                      host name to that host's own chain
+        :param commands: List of commands to execute on every channel (when hosts is a list)
+        :param max_workers: Maximum concurrent chains (default: min(32, len(hosts)))
+        :return: Dictionary mapping hosts to their command results
+        """
+        if not hosts:
+            return {}
+        host_commands = hosts if isinstance(hosts, dict) else {host: commands for host in hosts}
+        
+        # Too many concurrent sessions degrades throughput, so cap the pool
+        workers = max_workers or min(MAX_CHAIN_WORKERS, len(host_commands))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.execute_chain_commands, host, chain): host
+                for host, chain in host_commands.items()
+            }
+            return {
+                futures[future]: future.result()
+                for future in concurrent.futures.as_completed(futures)
+            }
+    
+    @staticmethod
+    def _is_simple_chain(commands: List[ChannelCommand]) -> bool:
+        """
+        Check whether a chain can be batched into a single exec request.
+        
+        :param commands: List of commands
+        :return: True if no command needs prompt/expect handling or cleaning
+        """
+        return len(commands) > 1 and all(
+            not c.expect_patterns and not c.wait_for_prompt and not c.clean_channel
+            for c in commands
+        )
+    
+    def _execute_batched_chain(self, host: str, commands: List[ChannelCommand],
+                               continue_on_error: bool = False) -> List[ChannelResult]:
+        """
+        Execute a non-interactive chain as a single exec request.
+        
+        Each command is followed by a marker carrying its index and exit
+        status, so the combined output can be split back per command.
+        Unless continue_on_error is set, commands after a failing one are
+        not run. Each result's duration is the elapsed time of the whole batch.
+        
+        :param host: Host name
+        :param commands: List of commands to execute
+        :param continue_on_error: Run the remaining commands after a failure
+        :return: List of command results
+        """
+        lines = []
+        cd_line = self._cd_line(host)
+        if cd_line:
+            lines.append(cd_line)
+        for i, cmd in enumerate(commands):
+            # Group each command so '&', ';' or a trailing comment in it
+            # can't change how the chain is joined
+            line = f"{{ {cmd.command}\n}}; __vwt_rc=$?; {CHAIN_END_MARKER.format(i)}"
+            if not continue_on_error:
+                line += "; [ $__vwt_rc -eq 0 ] || exit $__vwt_rc"
+            lines.append(line)
+        script = '\n'.join(lines)
+        timeout = sum(c.timeout for c in commands)
+        
+        start_time = time.monotonic()
+        try:
+            channel = self.ssh_client.get_transport().open_session(
+                window_size=self.window_size,
+                max_packet_size=self.max_packet_size
+            )
+            channel.settimeout(timeout)
+            channel.set_combine_stderr(True)
+            channel.exec_command(script)
+            
+            output, error, _ = self.fetch_output(
+                channel,
+                timeout=timeout,
+                max_output_bytes=sum(c.max_output_bytes for c in commands)
+            )
+            # A command that outlives the timeout keeps running, as it would
+            # on the shell channel; one that floods the output is stopped by
+            # closing the channel, since Ctrl-C needs a pty
+            truncated = output.endswith(OUTPUT_TRUNCATED_NOTICE)
+            exit_code = channel.recv_exit_status() if channel.exit_status_ready() and not truncated else None
+            if exit_code is not None or truncated:
+                channel.close()
+        except Exception as e:
+            duration = time.monotonic() - start_time
+            self.logger.error(f"Error executing batched chain on {host}: {e}")
+            return [ChannelResult(
+                command="chain_execution",
+                output="",
+                error=str(e),
+                duration=duration,
+                success=False
+            )]
+        
+        duration = time.monotonic() - start_time
+        # The batch ran as one request, so its results share one wall-clock stamp
+        timestamp = datetime.now()
+        # split() with two groups yields [output, index, status, output, ...]
+        pieces = CHAIN_END_RE.split(output)
+        finished = {int(pieces[j]): (pieces[j - 1], int(pieces[j + 1])) for j in range(1, len(pieces) - 1, 3)}
+        remainder = pieces[-1]
+        stopped = False
+        results = []
+        for i, cmd in enumerate(commands):
+            if i in finished:
+                segment, code = finished[i]
+            elif remainder is not None and not stopped:
+                # Still running at the timeout, or the chain stopped before
+                # it could report (e.g. the initial cd failed)
+                segment, code, remainder = remainder, exit_code, None
+            else:
+                results.append(ChannelResult(
+                    command=cmd.command,
+                    output="",
+                    error="Not executed: previous command failed",
+                    duration=0.0,
+                    timestamp=timestamp,
+                    success=False
+                ))
+                continue
+            
+            if code == 0 and cmd.command.strip().startswith('cd '):
+                self._update_current_directory(host, cmd.command)
+            stopped = code != 0 and not continue_on_error
+            segment_truncated = segment.endswith(OUTPUT_TRUNCATED_NOTICE)
+            results.append(ChannelResult(
+                command=cmd.command,
+                output=segment,
+                error=error if i == len(commands) - 1 else "",
+                exit_code=code,
+                duration=duration,
+                timestamp=timestamp,
+                success=code == 0 and not segment_truncated,
+                truncated=segment_truncated,
+                # No status means the command was still running at the timeout
+                timed_out=code is None and not segment_truncated
+            ))
+        
         return results
     
+    def _cd_line(self, host: str) -> str:
+        """
+        Build the command that moves a fresh exec session to the tracked directory.
+        
+        :param host: Host name
+        :return: Shell command line, or "" when the session starts there already
+        """
+        current_dir = self.current_directory.get(host, '~')
+        prefix, _, rest = current_dir.partition('/')
+        if TILDE_PREFIX_RE.fullmatch(prefix) and current_dir != '~':
+            # Keep the tilde outside the quotes so the shell expands it
+            return f"cd {prefix}/{shlex.quote(rest)} || exit" if rest else f"cd {prefix} || exit"
+        if current_dir != '~':
+            return f"cd {shlex.quote(current_dir)} || exit"
+        return ""
+    
+    def _execute_exec_command(self, host: str, cmd: ChannelCommand) -> ChannelResult:
+        """
+        Execute a non-interactive command on its own exec channel.
+        
+        The exit status comes from the SSH channel itself, so no marker
+        or prompt detection is needed.
+        
+        :param host: Host name
+        :param cmd: Command to execute
+        :return: Command result
+        """
+        cd_line = self._cd_line(host)
+        script = f"{cd_line}\n{cmd.command}" if cd_line else cmd.command
+        
+        start_time = time.monotonic()
+        try:
+            channel = self.ssh_client.get_transport().open_session(
+                window_size=self.window_size,
+                max_packet_size=self.max_packet_size
+            )
+            channel.settimeout(cmd.timeout)
+            channel.set_combine_stderr(True)
+            channel.exec_command(script)
+            
+            output, error, _ = self.fetch_output(
+                channel,
+                timeout=cmd.timeout,
+                max_output_bytes=cmd.max_output_bytes
+            )
+            truncated = output.endswith(OUTPUT_TRUNCATED_NOTICE)
+            exit_code = channel.recv_exit_status() if channel.exit_status_ready() and not truncated else None
+            if exit_code is not None or truncated:
+                channel.close()
+        except Exception as e:
+            duration = time.monotonic() - start_time
+            return ChannelResult(
+                command=cmd.command,
+                output="",
+                error=str(e),
+                duration=duration,
+                success=False
+            )
+        
+        duration = time.monotonic() - start_time
+        if exit_code == 0 and cmd.command.strip().startswith('cd '):
+            self._update_current_directory(host, cmd.command)
+        
+        return ChannelResult(
+            command=cmd.command,
+            output=output,
+            error=error,
+            exit_code=exit_code,
+            duration=duration,
+            success=exit_code == 0 and not truncated,
+            truncated=truncated,
+            timed_out=exit_code is None and not truncated
+        )
+    
     def _execute_single_command(self, channel: Channel, cmd: ChannelCommand, host: str) -> ChannelResult:
         """
         Execute a single command on a channel.
@@ -210,35 +876,74 @@ class ChannelManager:
         :param host: Host name
         :return: Command result
         """
-        start_time = time.time()
+        start_time = time.monotonic()
+        
+        info = self.channel_info.get(host)
+        if info is not None:
+            # Refreshed per command, so the idle sweep can't reap the
+            # channel between the commands of a long chain
+            info.last_used = start_time
+        
+        # Opted-in non-interactive commands skip the shell and its markers
+        if cmd.use_exec and not (cmd.expect_patterns or cmd.wait_for_prompt or cmd.clean_channel):
+            return self._execute_exec_command(host, cmd)
         
         try:
             # Clean channel if requested
             if cmd.clean_channel:
                 self._clean_channel_buffer(channel)
             
-            # Send command
-            command_with_newline = cmd.command + '\n'
-            channel.send(command_with_newline)
+            # Send command, followed by the exit status marker if requested;
+            # otherwise the prompt, expect patterns or timeout end it
+            if cmd.capture_exit_code:
+                marker, end_regex = _exit_code_marker()
+                channel.sendall(cmd._wire + marker)
+            else:
+                end_regex = None
+                channel.sendall(cmd._wire)
             
-            # Wait for output
-            output, error = self.fetch_output(
-                channel, 
-                timeout=cmd.timeout,
-                expect_patterns=cmd.expect_patterns,
-                expect_responses=cmd.expect_responses,
-                wait_for_prompt=cmd.wait_for_prompt,
-                prompt_pattern=cmd.prompt_pattern
-            )
+            # Only reuse the registration if it belongs to this channel
+            selector = info.selector if info is not None and self.channels.get(host) is channel else None
             
-            # Update current directory if it's a cd command
-            if cmd.command.strip().startswith('cd '):
-                self._update_current_directory(host, cmd.command)
+            # Wait for output; commands that only wait for the exit status
+            # marker take the plain read loop, which skips the other checks
+            if end_regex is not None and not (cmd.expect_patterns or cmd.wait_for_prompt):
+                output, error = _fetch_plain(channel, selector, self.default_window_size, end_regex,
+                                             cmd.timeout, cmd.max_output_bytes)
+            else:
+                output, error, _ = self.fetch_output(
+                    channel, 
+                    timeout=cmd.timeout,
+                    expect_patterns=cmd.expect_patterns,
+                    expect_responses=cmd._response_lines,
+                    wait_for_prompt=cmd.wait_for_prompt,
+                    prompt_pattern=cmd._compiled_prompt,
+                    end_pattern=end_regex,
+                    expect_regex=cmd._expect_regex,
+                    max_output_bytes=cmd.max_output_bytes,
+                    selector=selector
+                )
             
-            duration = time.time() - start_time
+            duration = time.monotonic() - start_time
+            
+            # The command was interrupted; drop what it printed meanwhile
+            truncated = output.endswith(OUTPUT_TRUNCATED_NOTICE)
+            if truncated:
+                self._clean_channel_buffer(channel)
             
-            # Try to extract exit code
-            exit_code = self._extract_exit_code(output)
+            if end_regex is None:
+                # No marker, so there is no exit status to judge by
+                exit_code, timed_out = None, False
+                succeeded = not truncated
+            else:
+                # Without the marker the command is still running
+                exit_code, output = self._extract_exit_code(output, end_regex)
+                timed_out = exit_code is None and not truncated
+                succeeded = exit_code == 0 and not truncated
+            
+            # Update current directory if it's a cd command
+            if cmd.command.strip().startswith('cd ') and succeeded:
+                self._update_current_directory(host, cmd.command)
             
             return ChannelResult(
                 command=cmd.command,
@@ -246,11 +951,13 @@ class ChannelManager:
                 error=error,
                 exit_code=exit_code,
                 duration=duration,
-                success=exit_code == 0 if exit_code is not None else True
+                success=succeeded,
+                truncated=truncated,
+                timed_out=timed_out
             )
             
         except Exception as e:
-            duration = time.time() - start_time
+            duration = time.monotonic() - start_time
             return ChannelResult(
                 command=cmd.command,
                 output="",
@@ -260,66 +967,166 @@ class ChannelManager:
             )
     
     def fetch_output(self, channel: Channel, timeout: float = 30.0, encoding: str = 'utf-8', 
-                    window_size: int = 4096, poll_iterations: int = 10, logger=None, 
-                    expect_patterns: List[str] = None, expect_responses: Dict[str, str] = None, 
-                    wait_for_prompt: bool = False, prompt_pattern: str = None) -> Tuple[str, str, Channel]:
+                    window_size: int = None, poll_iterations: int = 10, logger=None, 
+                    expect_patterns: List[str] = None, expect_responses: Dict[str, Union[str, bytes]] = None, 
+                    wait_for_prompt: bool = False,
+                    prompt_pattern: Union[str, Pattern] = None,
+                    end_pattern: Union[str, Pattern] = None,
+                    selector: selectors.BaseSelector = None,
+                    expect_regex: _ExpectPatterns = None,
+                    max_output_bytes: int = None) -> Tuple[str, str, Channel]:
         """
         Fetch output from a channel with pattern matching.
         
         :param channel: SSH channel
         :param timeout: Timeout in seconds
         :param encoding: Output encoding
-        :param window_size: Window size for reading
-        :param poll_iterations: Number of polling iterations
+        :param window_size: Window size for reading (None for manager default)
+        :param poll_iterations: Unused; reads block until data, EOF or the timeout
         :param logger: Logger instance
         :param expect_patterns: Patterns to expect in output
-        :param expect_responses: Responses to send for patterns
+        :param expect_responses: Responses to send for patterns (bytes are sent as complete lines)
         :param wait_for_prompt: Whether to wait for prompt
-        :param prompt_pattern: Pattern for prompt
-        :return: Tuple of (output, error, channel)
+        :param prompt_pattern: Pattern for prompt (string or compiled regex)
+        :param end_pattern: Pattern marking the end of the command's output
+        :param selector: Selector the channel is already registered with (None to use select())
+        :param expect_regex: expect_patterns already compiled by _compile_expect_patterns
+        :param max_output_bytes: Interrupt the command (Ctrl-C) once its output exceeds this size
+        :return: Tuple of (output, error, channel); truncated output ends with OUTPUT_TRUNCATED_NOTICE
         """
         logger = logger or self.logger
+        window_size = window_size or self.default_window_size
         expect_patterns = expect_patterns or []
         expect_responses = expect_responses or {}
         
-        output = ""
-        error = ""
-        start_time = time.time()
+        compiled_prompt = None
+        if wait_for_prompt and prompt_pattern:
+            compiled_prompt = re.compile(prompt_pattern)
+        
+        # Expect patterns are compiled once, combined where they can be
+        if expect_regex is None:
+            expect_regex = _compile_expect_patterns(expect_patterns)
+        end_regex = re.compile(end_pattern) if end_pattern else None
+        
+        # Accumulate raw chunks and decode once; tail holds the recent
+        # decoded output that pattern matching runs against
+        output_chunks: List[bytes] = []
+        error_chunks: List[bytes] = []
+        tail = ""
+        # Characters at the end of tail not yet searched for expect/end patterns
+        fresh = 0
+        output_size = 0
+        truncated = False
+        scan_output = bool(expect_regex or compiled_prompt or end_regex)
+        decoder = codecs.getincrementaldecoder(encoding)(errors='ignore')
+        
+        # Bind channel methods once; the poll loop calls them repeatedly
+        recv_ready = channel.recv_ready
+        recv = channel.recv
+        stderr_ready = channel.recv_stderr_ready
+        recv_stderr = channel.recv_stderr
+        exit_ready = channel.exit_status_ready
+        monotonic = time.monotonic
+        start_time = monotonic()
         
         try:
-            while time.time() - start_time < timeout:
-                if channel.recv_ready():
-                    data = channel.recv(window_size).decode(encoding, errors='ignore')
-                    output += data
+            while True:
+                remaining = timeout - (monotonic() - start_time)
+                if remaining <= 0:
+                    break
+                
+                # Block on the channel's event pipe until paramiko buffers data
+                # or sees EOF; the remote side sends EOF along with its exit status
+                if selector is not None:
+                    readable = selector.select(remaining)
+                else:
+                    readable, _, _ = select.select([channel], [], [], remaining)
+                if not readable:
+                    if exit_ready():
+                        break
+                    continue
+                
+                # Query readiness once per wake; after that a short read
+                # means paramiko's buffer is empty, so it isn't asked again
+                out_ready = recv_ready()
+                err_ready = stderr_ready()
+                if out_ready or err_ready:
+                    # Drain everything already buffered before waiting again
+                    while out_ready:
+                        data = recv(window_size)
+                        if not data:
+                            break
+                        output_size += len(data)
+                        if max_output_bytes and output_size > max_output_bytes:
+                            # Keep up to the limit and stop reading a runaway command
+                            output_chunks.append(data[:len(data) - (output_size - max_output_bytes)])
+                            truncated = True
+                            break
+                        output_chunks.append(data)
+                        if scan_output:
+                            scan_data = data
+                            if len(data) > EXPECT_SCAN_BYTES:
+                                # Only the window is matched, so don't decode the rest of a
+                                # large read; a character cut at the front is dropped
+                                decoder.reset()
+                                scan_data = data[-EXPECT_SCAN_BYTES:]
+                            # The incremental decoder keeps split multi-byte characters intact
+                            text = decoder.decode(scan_data)
+                            tail = (tail + text)[-EXPECT_SCAN_WINDOW:]
+                            fresh += len(text)
+                        out_ready = len(data) == window_size and recv_ready()
+                    if truncated:
+                        channel.send(b'\x03')
+                        break
+                    while err_ready:
+                        data = recv_stderr(window_size)
+                        if not data:
+                            break
+                        error_chunks.append(data)
+                        err_ready = len(data) == window_size and stderr_ready()
+                    if not scan_output:
+                        continue
+                    
+                    # Only search new output plus a small overlap
+                    scan_start = max(0, len(tail) - fresh - EXPECT_SCAN_OVERLAP)
+                    fresh = 0
                     
                     # Check for expect patterns
-                    for pattern in expect_patterns:
-                        if re.search(pattern, output, re.IGNORECASE):
-                            response = expect_responses.get(pattern, "")
-                            if response:
-                                channel.send(response + '\n')
-                                output += response + '\n'
+                    found = expect_regex.search(tail, scan_start) if expect_regex else None
+                    if found:
+                        index, match = found
+                        pattern = expect_patterns[index]
+                        # Consume the match so it isn't answered twice; the
+                        # rest is searched again on the next wake
+                        tail = tail[match.end():]
+                        scan_start = 0
+                        fresh = len(tail)
+                        response = expect_responses.get(pattern, "")
+                        if response:
+                            if isinstance(response, str):
+                                response = (response + '\n').encode(encoding)
+                            channel.send(response)
+                            output_chunks.append(response)
                     
-                    # Check for prompt if waiting
-                    if wait_for_prompt and prompt_pattern:
-                        if re.search(prompt_pattern, output):
-                            break
-                
-                elif channel.recv_stderr_ready():
-                    data = channel.recv_stderr(window_size).decode(encoding, errors='ignore')
-                    error += data
+                    # Check for prompt in the latest output only
+                    if compiled_prompt and compiled_prompt.search(tail[-PROMPT_SCAN_WINDOW:]):
+                        break
+                    
+                    if end_regex and end_regex.search(tail, scan_start):
+                        break
                 
-                elif channel.exit_status_ready():
+                # Woken without data: the pipe stays set once the remote side is done
+                elif exit_ready() or channel.eof_received:
                     break
-                
-                else:
-                    time.sleep(timeout / poll_iterations)
             
-            return output, error, channel
+            output = _decode_chunks(output_chunks, encoding)
+            if truncated:
+                output += OUTPUT_TRUNCATED_NOTICE
+            return output, _decode_chunks(error_chunks, encoding), channel
             
         except Exception as e:
             logger.error(f"Error fetching output: {e}")
-            return output, str(e), channel
+            return _decode_chunks(output_chunks, encoding), str(e), channel
     
     def _clean_channel_buffer(self, channel: Channel):
         """
@@ -328,38 +1135,57 @@ class ChannelManager:
         :param channel: SSH channel
         """
         try:
-            while channel.recv_ready():
-                channel.recv(1024)
+            previous_timeout = channel.gettimeout()
+        except:
+            return
+        try:
+            # Non-blocking reads: each recv returns everything buffered up to 1MB
+            channel.settimeout(0.0)
+            for recv in (channel.recv, channel.recv_stderr):
+                while True:
+                    try:
+                        if not recv(CLEAN_RECV_SIZE):
+                            break
+                    except socket.timeout:
+                        break
         except:
             pass
+        finally:
+            try:
+                channel.settimeout(previous_timeout)
+            except:
+                pass
     
     def _update_current_directory(self, host: str, cd_command: str):
         """
         Update the current directory tracking.
         
+        Paths are resolved with posixpath since the remote side is always
+        POSIX; '~' stands for the (unknown) home directory a shell starts in.
+        
         :param host: Host name
         :param cd_command: CD command that was executed
         """
         try:
-            # Extract directory from cd command
-            parts = cd_command.strip().split()
-            if len(parts) >= 2:
-                directory = parts[1]
-                
-                # Handle relative paths
-                if directory == '-':
-                    # Go back to previous directory
-                    if host in self.current_directory:
-                        prev_dir = self.current_directory.get(host + '_prev', '/')
-                        self.current_directory[host + '_prev'] = self.current_directory[host]
-                        self.current_directory[host] = prev_dir
-                elif directory.startswith('/'):
-                    # Absolute path
-                    self.current_directory[host + '_prev'] = self.current_directory.get(host, '/')
-                    self.current_directory[host] = directory
-                else:
-                    # Relative path - would need to resolve
-                    pass
+            # Extract directory from cd command, honouring quotes and
+            # skipping options such as -P/-L and '--'
+            args = shlex.split(cd_command)[1:]
+            while args and args[0] != '-' and args[0].startswith('-'):
+                if args.pop(0) == '--':
+                    break
+            directory = args[0] if args else '~'
+            
+            current = self.current_directory.get(host, '~')
+            if directory == '-':
+                directory = self.previous_directory.get(host, current)
+            if not directory.startswith('~'):
+                directory = posixpath.join(current, directory)
+            # Home-relative paths replace the current one like absolute
+            # paths do; '~user' prefixes are kept for the shell to expand
+            new_dir = _normalize_tracked_path(directory)
+            
+            self.previous_directory[host] = current
+            self.current_directory[host] = new_dir
         except Exception as e:
             self.logger.debug(f"Error updating current directory: {e}")
     
@@ -370,16 +1196,37 @@ class ChannelManager:
         :param host: Host name
         :return: Channel information dictionary
         """
-        with self.lock:
-            if host in self.channel_info:
-                info = self.channel_info[host].copy()
-                if host in self.channels:
-                    channel = self.channels[host]
-                    info['is_active'] = self._is_channel_active(channel)
-                    info['current_directory'] = self.current_directory.get(host, '/')
-                return info
+        with self._host_lock(host):
+            record = self.channel_info.get(host)
+            if record is not None:
+                return self._channel_info_dict(host, record, datetime.now(), time.monotonic())
             return None
     
+    def _channel_info_dict(self, host: str, record: ChannelInfo, wall_now: datetime,
+                           monotonic_now: float) -> Dict[str, Any]:
+        """
+        Convert a ChannelInfo record to the public dictionary form.
+        
+        :param host: Host name
+        :param record: Channel bookkeeping record
+        :param wall_now: Current wall-clock time
+        :param monotonic_now: time.monotonic() taken at the same moment
+        :return: Channel information dictionary
+        """
+        # Convert the monotonic timestamp to wall-clock time on read
+        info = {
+            'type': record.type,
+            'created_at': record.created_at,
+            'last_used': wall_now - timedelta(seconds=monotonic_now - record.last_used),
+            'command_count': record.command_count,
+            'is_active': record.is_active
+        }
+        channel = self.channels.get(host)
+        if channel is not None:
+            info['is_active'] = self._is_channel_active(channel)
+            info['current_directory'] = self.current_directory.get(host, '~')
+        return info
+    
     def list_channels(self) -> Dict[str, Dict[str, Any]]:
         """
         List all channels and their information.
@@ -387,7 +1234,13 @@ class ChannelManager:
         :return: Dictionary of host to channel information
         """
         with self.lock:
-            return {host: self.get_channel_info(host) for host in self.channel_info.keys()}
+            records = list(self.channel_info.items())
+        # One clock reading converts every record
+        wall_now, monotonic_now = datetime.now(), time.monotonic()
+        return {
+            host: self._channel_info_dict(host, record, wall_now, monotonic_now)
+            for host, record in records
+        }
     
     def execute_interactive_commands(self, host: str, commands: List[Tuple[str, List[str]]], 
                                    timeout: float = 60.0) -> List[ChannelResult]:
@@ -411,22 +1264,20 @@ class ChannelManager:
         
         return self.execute_chain_commands(host, channel_commands, create_new_channel=True)
     
-    def _extract_exit_code(self, output: str) -> Optional[int]:
+    def _extract_exit_code(self, output: str, end_regex: Pattern) -> Tuple[Optional[int], str]:
         """
-        Extract exit code from command output.
+        Extract the exit code reported by the exit status marker.
         
         :param output: Command output
-        :return: Exit code or None if not found
+        :param end_regex: Regex for the command's marker, from _exit_code_marker
+        :return: Tuple of (exit code or None if not found, output without the marker)
         """
-        try:
-            # Look for echo $? pattern
-            lines = output.split('\n')
-            for line in reversed(lines):
-                if line.strip().isdigit():
-                    return int(line.strip())
-        except:
+        match = None
+        for match in end_regex.finditer(output):
             pass
-        return None
+        if match is None:
+            return None, output
+        return int(match.group(1)), output[:match.start()] + output[match.end():]
     
     def __enter__(self):
         return self
@@ -435,6 +1286,22 @@ class ChannelManager:
         self.close_all_channels()
 
 
+# Per-thread selector for execute_command, created once per thread
+_thread_state = threading.local()
+
+
+def _thread_selector() -> selectors.BaseSelector:
+    """
+    Get the calling thread's selector, creating it on first use.
+    
+    :return: Selector owned by the current thread
+    """
+    selector = getattr(_thread_state, 'selector', None)
+    if selector is None:
+        selector = _thread_state.selector = selectors.DefaultSelector()
+    return selector
+
+
 def execute_command(ssh_obj, command: str, timeout: float = 30.0, logger=None):
     """
     Execute a command using SSH object.
@@ -457,22 +1324,29 @@ def execute_command(ssh_obj, command: str, timeout: float = 30.0, logger=None):
         else:
             # Channel
             ssh_obj.send(command + '\n')
-            output = ""
-            error = ""
+            # Accumulate raw bytes and decode once, so multi-byte characters split across reads survive
+            output_buf = bytearray()
+            error_buf = bytearray()
             start_time = time.time()
             
-            while time.time() - start_time < timeout:
-                if ssh_obj.recv_ready():
-                    data = ssh_obj.recv(4096).decode('utf-8')
-                    output += data
-                elif ssh_obj.recv_stderr_ready():
-                    data = ssh_obj.recv_stderr(4096).decode('utf-8')
-                    error += data
-                elif ssh_obj.exit_status_ready():
-                    break
-                else:
-                    time.sleep(0.1)
+            selector = _thread_selector()
+            selector.register(ssh_obj, selectors.EVENT_READ)
+            try:
+                while time.time() - start_time < timeout:
+                    if ssh_obj.recv_ready():
+                        output_buf += ssh_obj.recv(RECV_SIZE)
+                    elif ssh_obj.recv_stderr_ready():
+                        error_buf += ssh_obj.recv_stderr(RECV_SIZE)
+                    elif ssh_obj.exit_status_ready():
+                        break
+                    else:
+                        # Wait for paramiko to buffer more data instead of sleeping
+                        selector.select(min(0.1, timeout - (time.time() - start_time)))
+            finally:
+                selector.unregister(ssh_obj)
             
+            output = output_buf.decode('utf-8', errors='ignore')
+            error = error_buf.decode('utf-8', errors='ignore')
             exit_code = ssh_obj.recv_exit_status() if ssh_obj.exit_status_ready() else None
         
         return {
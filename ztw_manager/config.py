@@ -55,6 +55,7 @@ class SecurityConfig:
     known_hosts_file: str = "~/.ssh/known_hosts"
     key_types: List[str] = field(default_factory=lambda: ["ssh-rsa", "ssh-ed25519", "ecdsa-sha2-nistp256"])
     cipher_preferences: List[str] = field(default_factory=lambda: ["aes256-gcm@openssh.com", "aes128-gcm@openssh.com"])
+    allow_legacy_algorithms: bool = False
 
 
 @dataclass
@@ -276,6 +277,7 @@ class Config:
             'known_hosts_file': self.security.known_hosts_file,
             'key_types': self.security.key_types,
             'cipher_preferences': self.security.cipher_preferences,
+            'allow_legacy_algorithms': self.security.allow_legacy_algorithms,
         }
         
         # Ensure directory exists
@@ -4,24 +4,131 @@ Manages SSH connections with pooling, health checks, and automatic cleanup.
 """
 
 import time
+import heapq
+import socket
+import asyncio
+import weakref
 import threading
-from typing import Dict, List, Optional, Tuple, Any
+import concurrent.futures
+from typing import Dict, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass, field
 from datetime import datetime
 from contextlib import contextmanager
-from paramiko import SSHClient, AutoAddPolicy
+from paramiko import SSHClient, AutoAddPolicy, Channel, Transport
 from paramiko.ssh_exception import (
     SSHException, AuthenticationException, NoValidConnectionsError,
     BadHostKeyException
 )
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from .logger import StructuredLogger
 
 # Author: Vamsi
 
+# Pool key: (host, port, user)
+ConnectionKey = Tuple[str, int, str]
 
-@dataclass
+# Concurrent sessions opened per connection (OpenSSH's default MaxSessions)
+MAX_SESSIONS = 10
+
+# Number of per-key lock stripes; connecting to one host never blocks another
+LOCK_STRIPES = 64
+
+# SSH keepalive interval in seconds; the kernel drops a wedged TCP
+# connection after the same bound via TCP_USER_TIMEOUT
+KEEPALIVE_INTERVAL = 30
+
+# Connect attempts per _create_connection call and the backoff between them;
+# refused connections are not retried
+CONNECT_ATTEMPTS = 3
+CONNECT_BACKOFF = 0.25
+CONNECT_BACKOFF_MAX = 10.0
+
+# Keys whose connect failed are refused without a new attempt for this long,
+# doubling per consecutive failure up to the cap
+FAILED_CONNECT_BACKOFF = 5.0
+FAILED_CONNECT_BACKOFF_MAX = 300.0
+
+# Host key policy shared by every client; the policy object is stateless
+_AUTO_ADD = AutoAddPolicy()
+
+# Liveness probes run concurrently per health check pass
+HEALTH_CHECK_WORKERS = 16
+
+# Target connections opened concurrently by open_channels_through_jumphost
+JUMPHOST_CONNECT_WORKERS = 32
+
+# Seconds a successful liveness probe is trusted before an idle connection is probed again
+PROBE_TTL = 10.0
+
+# Algorithms only old servers still need; passed to paramiko as
+# disabled_algorithms unless the pool allows legacy algorithms
+LEGACY_ALGORITHMS = {
+    'ciphers': ['aes128-cbc', 'aes192-cbc', 'aes256-cbc', '3des-cbc'],
+    'macs': ['hmac-sha1', 'hmac-sha1-96', 'hmac-md5', 'hmac-md5-96'],
+    'kex': ['diffie-hellman-group-exchange-sha1', 'diffie-hellman-group14-sha1',
+            'diffie-hellman-group1-sha1'],
+}
+
+
+def _prefer(available: Tuple[str, ...], first: Tuple[str, ...], last: Tuple[str, ...] = ()) -> Tuple[str, ...]:
+    """
+    Reorder an algorithm list so the given algorithms come first or last.
+    
+    :param available: Algorithms the installed paramiko supports, in its order
+    :param first: Algorithms to move to the front, if supported
+    :param last: Algorithms to move to the back, if supported
+    :return: Reordered algorithm tuple
+    """
+    head = tuple(name for name in first if name in available)
+    tail = tuple(name for name in last if name in available and name not in head)
+    return head + tuple(name for name in available if name not in head and name not in tail) + tail
+
+
+class _FastTransport(Transport):
+    """
+    Transport that offers AES-GCM, ETM MACs and curve25519 first, so servers
+    that support them negotiate the hardware-accelerated paths. The
+    LEGACY_ALGORITHMS are offered last, for pools that allow them at all.
+    """
+    _preferred_ciphers = _prefer(
+        Transport._preferred_ciphers,
+        ('aes128-gcm@openssh.com', 'aes256-gcm@openssh.com'),
+        last=tuple(LEGACY_ALGORITHMS['ciphers']))
+    _preferred_macs = _prefer(
+        Transport._preferred_macs,
+        ('hmac-sha2-256-etm@openssh.com', 'hmac-sha2-512-etm@openssh.com'),
+        last=tuple(LEGACY_ALGORITHMS['macs']))
+    _preferred_kex = _prefer(
+        Transport._preferred_kex,
+        ('curve25519-sha256@libssh.org',))
+
+
+def _new_client() -> SSHClient:
+    """
+    Create an SSH client with the pool's host key policy.
+    
+    :return: Unconnected SSH client
+    """
+    client = SSHClient()
+    client.set_missing_host_key_policy(_AUTO_ADD)
+    return client
+
+
+def _close_on_collect(client: SSHClient):
+    """
+    Close a connected client's transport once the client is garbage
+    collected, so a caller that drops it without close() doesn't leave the
+    transport thread and socket behind.
+    
+    :param client: Connected SSH client
+    """
+    transport = client.get_transport()
+    if transport is not None:
+        # Bound to the transport only; the finalizer must not keep client alive
+        weakref.finalize(client, transport.close)
+
+
+@dataclass(slots=True)
 class ConnectionInfo:
     """Information about an SSH connection."""
     host: str
@@ -29,11 +136,13 @@ class ConnectionInfo:
     user: str
     client: SSHClient
     created_at: datetime
-    last_used: datetime
+    last_used: float  # time.monotonic() timestamp
     use_count: int = 0
     is_active: bool = True
     error_count: int = 0
     last_error: Optional[str] = None
+    last_probe_ok_at: float = 0.0  # time.monotonic() of the last successful probe
+    session_slots: Optional[threading.BoundedSemaphore] = field(default=None, repr=False)
 
 
 class ConnectionPool:
@@ -43,7 +152,12 @@ class ConnectionPool:
                  max_connections: int = 50,
                  max_idle_time: int = 300,
                  connection_timeout: int = 30,
-                 health_check_interval: int = 60):
+                 health_check_interval: int = 60,
+                 probe_ttl: float = PROBE_TTL,
+                 max_sessions: int = MAX_SESSIONS,
+                 loop: Optional[asyncio.AbstractEventLoop] = None,
+                 keepalive_interval: int = KEEPALIVE_INTERVAL,
+                 allow_legacy_algorithms: bool = False):
         """
         Initialize connection pool.
         
@@ -51,24 +165,54 @@ class ConnectionPool:
         :param max_idle_time: Maximum idle time in seconds
         :param connection_timeout: Connection timeout in seconds
         :param health_check_interval: Health check interval in seconds
+        :param probe_ttl: Seconds a successful probe is trusted for idle connections
+        :param max_sessions: Maximum concurrent channels handed out per connection
+        :param loop: Event loop to schedule health checks on instead of a dedicated thread
+        :param keepalive_interval: SSH/TCP keepalive interval in seconds (0 disables)
+        :param allow_legacy_algorithms: Also offer LEGACY_ALGORITHMS, for old servers
         """
         self.max_connections = max_connections
         self.max_idle_time = max_idle_time
         self.connection_timeout = connection_timeout
         self.health_check_interval = health_check_interval
+        self.probe_ttl = probe_ttl
+        self.max_sessions = max_sessions
+        self.keepalive_interval = keepalive_interval
+        self.disabled_algorithms = None if allow_legacy_algorithms else LEGACY_ALGORITHMS
         
-        # Connection storage
-        self.connections: Dict[str, ConnectionInfo] = {}
-        self.lock = threading.RLock()
+        # Connection storage; self.lock only guards short dict updates and a
+        # striped per-key lock serializes lookups of the same key
+        self.connections: Dict[ConnectionKey, ConnectionInfo] = {}
+        self.lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        # (last_used, key) entries, oldest first; entries superseded by a
+        # later use are skipped when popped
+        self._idle_heap: List[Tuple[float, ConnectionKey]] = []
         
-        # Health check thread
+        # Keys that failed to connect -> (don't retry before, current backoff);
+        # only the key's single-flight owner touches its entry
+        self._blackhole: Dict[ConnectionKey, Tuple[float, float]] = {}
+        
+        # Fixed host set registered by freeze(); slot i caches the pooled
+        # connection for key i so get_connection_fast skips the dict lookup
+        self._frozen_keys: List[ConnectionKey] = []
+        self._frozen_ids: Dict[ConnectionKey, int] = {}
+        self._frozen_slots: List[Optional[ConnectionInfo]] = []
+        
+        # Connections being opened; callers for the same key wait on the
+        # future instead of starting their own handshake
+        self._pending: Dict[ConnectionKey, concurrent.futures.Future] = {}
+        
+        # Health check thread, or a call_later handle when running on a loop
+        self.loop = loop
         self.health_check_thread = None
+        self._health_check_handle: Optional[asyncio.TimerHandle] = None
         self.stop_health_check_event = threading.Event()
         
-        # Start health check thread
+        # Start health check
         self._start_health_check()
     
-    def _get_connection_key(self, host: str, port: int, user: str) -> str:
+    def _get_connection_key(self, host: str, port: int, user: str) -> ConnectionKey:
         """
         Generate connection key.
         
@@ -77,17 +221,26 @@ class ConnectionPool:
         :param user: Username
         :return: Connection key
         """
-        return f"{host}:{port}:{user}"
+        # A tuple hashes without formatting a new string on every lookup
+        return (host, port, user)
+    
+    def _key_lock(self, connection_key: ConnectionKey) -> threading.Lock:
+        """
+        Get the lock stripe for a connection key.
+        
+        :param connection_key: Connection key
+        :return: Lock serializing work on that key
+        """
+        return self._stripes[hash(connection_key) % LOCK_STRIPES]
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((SSHException, AuthenticationException, NoValidConnectionsError))
-    )
     def _create_connection(self, host: str, port: int, user: str, 
                           password: str = None, key_file: str = None) -> SSHClient:
         """
-        Create a new SSH connection.
+        Create a new SSH connection, retrying transient SSH failures.
+        
+        A refused connection (NoValidConnectionsError) fails immediately;
+        SSHException/AuthenticationException are retried with a short
+        exponential backoff.
         
         :param host: Host name
         :param port: Port number
@@ -96,8 +249,29 @@ class ConnectionPool:
         :param key_file: Key file path
         :return: SSH client
         """
-        client = SSHClient()
-        client.set_missing_host_key_policy(AutoAddPolicy())
+        for attempt in range(CONNECT_ATTEMPTS):
+            try:
+                return self._connect_once(host, port, user, password, key_file)
+            except NoValidConnectionsError:
+                raise
+            except (SSHException, AuthenticationException):
+                if attempt == CONNECT_ATTEMPTS - 1:
+                    raise
+                time.sleep(min(CONNECT_BACKOFF_MAX, CONNECT_BACKOFF * 2 ** attempt))
+    
+    def _connect_once(self, host: str, port: int, user: str,
+                      password: str = None, key_file: str = None) -> SSHClient:
+        """
+        Make a single SSH connection attempt.
+        
+        :param host: Host name
+        :param port: Port number
+        :param user: Username
+        :param password: Password
+        :param key_file: Key file path
+        :return: SSH client
+        """
+        client = _new_client()
         
         try:
             if key_file:
@@ -108,7 +282,9 @@ class ConnectionPool:
                     key_filename=key_file,
                     timeout=self.connection_timeout,
                     banner_timeout=240,
-                    auth_timeout=60
+                    auth_timeout=60,
+                    transport_factory=_FastTransport,
+                    disabled_algorithms=self.disabled_algorithms
                 )
             elif password:
                 client.connect(
@@ -118,17 +294,48 @@ class ConnectionPool:
                     password=password,
                     timeout=self.connection_timeout,
                     banner_timeout=240,
-                    auth_timeout=60
+                    auth_timeout=60,
+                    transport_factory=_FastTransport,
+                    disabled_algorithms=self.disabled_algorithms
                 )
             else:
                 raise ValueError("Either password or key_file must be provided")
             
+            self._enable_keepalive(client)
+            _close_on_collect(client)
             return client
             
         except Exception as e:
             client.close()
             raise e
     
+    def _enable_keepalive(self, client: SSHClient):
+        """
+        Turn on SSH and TCP keepalives so a dead peer tears the transport
+        down and transport.is_active() reflects it without a probe.
+        
+        :param client: Connected SSH client
+        """
+        if not self.keepalive_interval:
+            return
+        transport = client.get_transport()
+        if transport is None:
+            return
+        transport.set_keepalive(self.keepalive_interval)
+        
+        sock = getattr(transport, 'sock', None)
+        if not isinstance(sock, socket.socket):
+            return
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if hasattr(socket, 'TCP_USER_TIMEOUT'):
+                # Bound how long unacknowledged data (e.g. a probe's
+                # open_session) can hang before the kernel resets the socket
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_USER_TIMEOUT,
+                                self.keepalive_interval * 1000)
+        except OSError:
+            pass
+    
     def get_connection(self, host: str, port: int, user: str, 
                       password: str = None, key_file: str = None) -> SSHClient:
         """
@@ -141,43 +348,172 @@ class ConnectionPool:
         :param key_file: Key file path
         :return: SSH client
         """
-        connection_key = self._get_connection_key(host, port, user)
+        return self._get_connection_info(host, port, user, password, key_file).client
+    
+    def freeze(self, hosts: List[Tuple[str, int, str]]) -> List[int]:
+        """
+        Register a fixed set of (host, port, user) keys for get_connection_fast.
         
+        :param hosts: (host, port, user) tuples known up front
+        :return: Key id per host, in order
+        """
         with self.lock:
-            # Check if connection exists and is active
-            if connection_key in self.connections:
-                conn_info = self.connections[connection_key]
-                
+            for host, port, user in hosts:
+                key = self._get_connection_key(host, port, user)
+                if key not in self._frozen_ids:
+                    self._frozen_ids[key] = len(self._frozen_keys)
+                    self._frozen_keys.append(key)
+                    self._frozen_slots.append(None)
+            return [self._frozen_ids[self._get_connection_key(*host)] for host in hosts]
+    
+    def key_id_of(self, host: str, port: int, user: str) -> int:
+        """
+        Look up the id freeze() assigned to a key.
+        
+        :param host: Host name
+        :param port: Port number
+        :param user: Username
+        :return: Key id for get_connection_fast
+        """
+        return self._frozen_ids[self._get_connection_key(host, port, user)]
+    
+    def get_connection_fast(self, key_id: int, password: str = None,
+                            key_file: str = None) -> SSHClient:
+        """
+        Get a connection for a key registered with freeze().
+        
+        A cached live connection is returned after a passive transport check
+        only; otherwise this falls back to the regular lookup and refills
+        the slot.
+        
+        :param key_id: Id from freeze() or key_id_of()
+        :param password: Password, used only if a new connection is needed
+        :param key_file: Key file path, used only if a new connection is needed
+        :return: SSH client
+        """
+        conn_info = self._frozen_slots[key_id]
+        if conn_info is not None and conn_info.is_active and \
+                self._is_transport_active(conn_info.client):
+            self._touch(self._frozen_keys[key_id], conn_info)
+            conn_info.use_count += 1
+            return conn_info.client
+        
+        host, port, user = self._frozen_keys[key_id]
+        conn_info = self._get_connection_info(host, port, user, password, key_file)
+        self._frozen_slots[key_id] = conn_info
+        return conn_info.client
+    
+    def _get_connection_info(self, host: str, port: int, user: str,
+                             password: str = None, key_file: str = None) -> ConnectionInfo:
+        """
+        Get a pooled connection's information, creating the connection if needed.
+        
+        :param host: Host name
+        :param port: Port number
+        :param user: Username
+        :param password: Password
+        :param key_file: Key file path
+        :return: Connection information
+        """
+        connection_key = self._get_connection_key(host, port, user)
+        
+        with self._key_lock(connection_key):
+            # Check if connection exists and is active; dict.get is atomic
+            conn_info = self.connections.get(connection_key)
+            if conn_info is not None:
                 # Check if connection is still valid
-                if self._test_connection(conn_info.client):
-                    conn_info.last_used = datetime.now()
+                if self._is_connection_usable(conn_info):
+                    self._touch(connection_key, conn_info)
                     conn_info.use_count += 1
-                    return conn_info.client
-                else:
-                    # Remove invalid connection
-                    self._remove_connection(connection_key)
+                    return conn_info
+                
+                # Remove invalid connection
+                self._remove_connection(connection_key)
+                try:
+                    conn_info.client.close()
+                except:
+                    pass
             
+            # Join a handshake already in flight for this key
+            pending = self._pending.get(connection_key)
+            if pending is None:
+                pending = self._pending[connection_key] = concurrent.futures.Future()
+                owner = True
+            else:
+                owner = False
+        
+        if not owner:
+            # No timeout of our own: the owner's retries can legitimately
+            # outlast any fixed bound, and it always resolves the future
+            # with the connection or its own exception
+            conn_info = pending.result()
+            self._touch(connection_key, conn_info)
+            conn_info.use_count += 1
+            return conn_info
+        
+        try:
             # Check pool size limit
             if len(self.connections) >= self.max_connections:
                 self._cleanup_idle_connections(count=1)
             
-            # Create new connection
-            client = self._create_connection(host, port, user, password, key_file)
+            # Fail fast on keys that failed recently instead of handshaking again
+            failed = self._blackhole.get(connection_key)
+            if failed is not None and failed[0] > time.monotonic():
+                raise SSHException(f"Connection to {host}:{port} recently failed; "
+                                   f"retrying in {failed[0] - time.monotonic():.0f}s")
+            
+            # Create new connection without holding any lock
+            try:
+                client = self._create_connection(host, port, user, password, key_file)
+            except Exception:
+                backoff = FAILED_CONNECT_BACKOFF if failed is None else \
+                    min(FAILED_CONNECT_BACKOFF_MAX, failed[1] * 2)
+                self._blackhole[connection_key] = (time.monotonic() + backoff, backoff)
+                raise
+            self._blackhole.pop(connection_key, None)
             
             # Store connection info
+            now = time.monotonic()
             conn_info = ConnectionInfo(
                 host=host,
                 port=port,
                 user=user,
                 client=client,
                 created_at=datetime.now(),
-                last_used=datetime.now(),
-                use_count=1
+                last_used=now,
+                use_count=1,
+                last_probe_ok_at=now,
+                session_slots=threading.BoundedSemaphore(self.max_sessions)
             )
             
-            self.connections[connection_key] = conn_info
+            with self.lock:
+                self.connections[connection_key] = conn_info
+                heapq.heappush(self._idle_heap, (now, connection_key))
             
-            return client
+            pending.set_result(conn_info)
+            return conn_info
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._key_lock(connection_key):
+                del self._pending[connection_key]
+    
+    def _touch(self, connection_key: ConnectionKey, conn_info: ConnectionInfo):
+        """
+        Record a use of a connection.
+        
+        :param connection_key: Connection key
+        :param conn_info: Connection information
+        """
+        now = time.monotonic()
+        with self.lock:
+            conn_info.last_used = now
+            heapq.heappush(self._idle_heap, (now, connection_key))
+            # Rebuild once superseded entries dominate the heap
+            if len(self._idle_heap) > 4 * len(self.connections) + 64:
+                self._idle_heap = [(info.last_used, key) for key, info in self.connections.items()]
+                heapq.heapify(self._idle_heap)
     
     def return_connection(self, host: str, port: int, user: str):
         """
@@ -201,23 +537,72 @@ class ConnectionPool:
         """
         connection_key = self._get_connection_key(host, port, user)
         
-        with self.lock:
-            if connection_key in self.connections:
-                conn_info = self.connections[connection_key]
+        with self._key_lock(connection_key):
+            conn_info = self._remove_connection(connection_key)
+            if conn_info is not None:
                 try:
                     conn_info.client.close()
                 except:
                     pass
-                self._remove_connection(connection_key)
     
-    def _remove_connection(self, connection_key: str):
+    def _remove_connection(self, connection_key: ConnectionKey, expected: ConnectionInfo = None) -> Optional[ConnectionInfo]:
         """
         Remove a connection from the pool.
         
         :param connection_key: Connection key
+        :param expected: Only remove the entry if it is still this connection
+        :return: Removed connection information or None
+        """
+        with self.lock:
+            if expected is None:
+                conn_info = self.connections.pop(connection_key, None)
+                if conn_info is None:
+                    return None
+            else:
+                if self.connections.get(connection_key) is not expected:
+                    return None
+                del self.connections[connection_key]
+                conn_info = expected
+            conn_info.is_active = False
+            return conn_info
+    
+    def _is_transport_active(self, client: SSHClient) -> bool:
+        """
+        Check the transport state without any network traffic.
+        
+        :param client: SSH client to check
+        :return: True if the transport is up and authenticated
         """
-        if connection_key in self.connections:
-            del self.connections[connection_key]
+        transport = client.get_transport()
+        return transport is not None and transport.is_active() and transport.is_authenticated()
+    
+    def _is_connection_usable(self, conn_info: ConnectionInfo) -> bool:
+        """
+        Check if a pooled connection can be handed out.
+        
+        Recently used connections are trusted if their transport is up; only
+        connections idle for over half of max_idle_time, and not probed
+        within probe_ttl, get a real round-trip probe. With keepalives on,
+        a dead peer closes the transport, so the passive check suffices.
+        
+        :param conn_info: Connection information
+        :return: True if connection is usable
+        """
+        if not self._is_transport_active(conn_info.client):
+            return False
+        if self.keepalive_interval:
+            return True
+        
+        now = time.monotonic()
+        if now - conn_info.last_used <= self.max_idle_time / 2:
+            return True
+        if now - conn_info.last_probe_ok_at < self.probe_ttl:
+            return True
+        
+        if self._test_connection(conn_info.client):
+            conn_info.last_probe_ok_at = time.monotonic()
+            return True
+        return False
     
     def _test_connection(self, client: SSHClient) -> bool:
         """
@@ -241,63 +626,104 @@ class ConnectionPool:
         :param count: Number of connections to clean up (None for all idle)
         """
         with self.lock:
-            now = datetime.now()
-            idle_connections = []
-            
-            for key, conn_info in self.connections.items():
-                idle_time = (now - conn_info.last_used).total_seconds()
-                if idle_time > self.max_idle_time:
-                    idle_connections.append((key, idle_time))
+            cutoff = time.monotonic() - self.max_idle_time
+            heap = self._idle_heap
+            removed = []
             
-            # Sort by idle time (oldest first)
-            idle_connections.sort(key=lambda x: x[1], reverse=True)
-            
-            # Remove connections
-            to_remove = count if count is not None else len(idle_connections)
-            for key, _ in idle_connections[:to_remove]:
-                conn_info = self.connections[key]
-                try:
-                    conn_info.client.close()
-                except:
-                    pass
-                self._remove_connection(key)
+            # Pop oldest first; closing happens outside the lock
+            while heap and heap[0][0] < cutoff and (count is None or len(removed) < count):
+                last_used, key = heapq.heappop(heap)
+                conn_info = self.connections.get(key)
+                # Skip entries for removed connections or superseded by a later use
+                if conn_info is not None and conn_info.last_used == last_used:
+                    conn_info.is_active = False
+                    removed.append(self.connections.pop(key))
+        
+        for conn_info in removed:
+            try:
+                conn_info.client.close()
+            except:
+                pass
     
     def _start_health_check(self):
-        """Start the health check thread."""
-        if self.health_check_thread is None:
-            self.stop_health_check_event.clear()
+        """Start the health check thread, or schedule it on the event loop."""
+        self.stop_health_check_event.clear()
+        if self.loop is not None:
+            # call_later is not thread-safe; hop onto the loop first
+            self.loop.call_soon_threadsafe(self._schedule_health_check)
+        elif self.health_check_thread is None:
             self.health_check_thread = threading.Thread(target=self._health_check_worker, daemon=True)
             self.health_check_thread.start()
     
+    def _schedule_health_check(self):
+        """Arm the next health check on the event loop."""
+        if not self.stop_health_check_event.is_set():
+            self._health_check_handle = self.loop.call_later(self.health_check_interval,
+                                                             self._run_health_check)
+    
+    def _run_health_check(self):
+        """Run one health check pass in the loop's executor, then re-arm."""
+        self._health_check_handle = None
+        future = self.loop.run_in_executor(None, self._health_check_pass)
+        future.add_done_callback(lambda _: self._schedule_health_check())
+    
+    def _health_check_pass(self):
+        """Clean up idle connections and probe the remaining ones once."""
+        try:
+            # Clean up idle connections
+            self._cleanup_idle_connections()
+            
+            # Test active connections from a snapshot, so probes don't
+            # block callers; probes fan out so a pass costs ~one RTT
+            snapshot = self.list_connections()
+            if not snapshot:
+                return
+            if self.keepalive_interval:
+                # Keepalives already tear dead transports down
+                results = [self._is_transport_active(info.client) for _, info in snapshot]
+            else:
+                workers = min(HEALTH_CHECK_WORKERS, len(snapshot))
+                with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(
+                        lambda item: self._test_connection(item[1].client), snapshot))
+            
+            now = time.monotonic()
+            for (key, conn_info), healthy in zip(snapshot, results):
+                if healthy:
+                    conn_info.last_probe_ok_at = now
+                else:
+                    conn_info.is_active = False
+                    conn_info.error_count += 1
+                    # Leave a connection that was replaced meanwhile alone
+                    if self._remove_connection(key, expected=conn_info) is not None:
+                        try:
+                            conn_info.client.close()
+                        except:
+                            pass
+            
+        except Exception as e:
+            # Log error and continue
+            pass
+    
     def _health_check_worker(self):
         """Health check worker thread."""
         while not self.stop_health_check_event.is_set():
-            try:
-                # Clean up idle connections
-                self._cleanup_idle_connections()
-                
-                # Test active connections
-                with self.lock:
-                    for key, conn_info in list(self.connections.items()):
-                        if not self._test_connection(conn_info.client):
-                            conn_info.is_active = False
-                            try:
-                                conn_info.client.close()
-                            except:
-                                pass
-                            self._remove_connection(key)
-                
-                # Wait for next check
-                self.stop_health_check_event.wait(self.health_check_interval)
-                
-            except Exception as e:
-                # Log error and continue
-                pass
+            self._health_check_pass()
+            
+            # Wait for next check
+            self.stop_health_check_event.wait(self.health_check_interval)
     
     def stop_health_check(self):
-        """Stop the health check thread."""
+        """Stop the health check thread or cancel the scheduled check."""
+        self.stop_health_check_event.set()
+        if self.loop is not None:
+            def cancel():
+                if self._health_check_handle is not None:
+                    self._health_check_handle.cancel()
+                    self._health_check_handle = None
+            if not self.loop.is_closed():
+                self.loop.call_soon_threadsafe(cancel)
         if self.health_check_thread:
-            self.stop_health_check_event.set()
             self.health_check_thread.join(timeout=5)
             self.health_check_thread = None
     
@@ -311,11 +737,9 @@ class ConnectionPool:
         :return: Connection information or None
         """
         connection_key = self._get_connection_key(host, port, user)
-        
-        with self.lock:
-            return self.connections.get(connection_key)
+        return self.connections.get(connection_key)
     
-    def list_connections(self) -> List[Tuple[str, ConnectionInfo]]:
+    def list_connections(self) -> List[Tuple[ConnectionKey, ConnectionInfo]]:
         """
         List all connections in the pool.
         
@@ -327,12 +751,15 @@ class ConnectionPool:
     def clear_pool(self):
         """Clear all connections from the pool."""
         with self.lock:
-            for conn_info in self.connections.values():
-                try:
-                    conn_info.client.close()
-                except:
-                    pass
+            connections = list(self.connections.values())
             self.connections.clear()
+            for conn_info in connections:
+                conn_info.is_active = False
+        for conn_info in connections:
+            try:
+                conn_info.client.close()
+            except:
+                pass
     
     @contextmanager
     def get_connection_context(self, host: str, port: int, user: str,
@@ -353,6 +780,36 @@ class ConnectionPool:
         finally:
             self.return_connection(host, port, user)
     
+    @contextmanager
+    def get_channel_context(self, host: str, port: int, user: str,
+                            password: str = None, key_file: str = None):
+        """
+        Context manager for a session channel on a pooled connection.
+        
+        Callers share one authenticated transport per host instead of each
+        opening their own connection; at most max_sessions channels are open
+        on it at once, and further callers wait for a free slot.
+        
+        :param host: Host name
+        :param port: Port number
+        :param user: Username
+        :param password: Password
+        :param key_file: Key file path
+        :yield: Session channel, closed on exit
+        """
+        conn_info = self._get_connection_info(host, port, user, password, key_file)
+        slots = conn_info.session_slots
+        if not slots.acquire(timeout=self.connection_timeout):
+            raise SSHException(f"No free session on {host}:{port} after {self.connection_timeout}s")
+        try:
+            channel = conn_info.client.get_transport().open_session()
+            try:
+                yield channel
+            finally:
+                channel.close()
+        finally:
+            slots.release()
+    
     def __enter__(self):
         return self
     
@@ -361,6 +818,19 @@ class ConnectionPool:
         self.clear_pool()
 
 
+@dataclass(slots=True)
+class _JumphostSlot:
+    """A jumphost connection and the direct-tcpip channels routed over it."""
+    client: SSHClient
+    channels: List[Channel] = field(default_factory=list)
+    reserved: int = 0  # channel opens in flight
+    
+    def load(self) -> int:
+        """Drop closed channels and return the number of targets on this transport."""
+        self.channels = [channel for channel in self.channels if not channel.closed]
+        return len(self.channels) + self.reserved
+
+
 class JumphostConnectionPool(ConnectionPool):
     """Connection pool for jumphost connections."""
     
@@ -374,6 +844,12 @@ class JumphostConnectionPool(ConnectionPool):
         super().__init__(**kwargs)
         self.jumphost_config = jumphost_config
         self.jumphost_client = None
+        
+        # Targets are spread over several jumphost transports so no single
+        # one runs out of channels; guarded by _jumphost_lock
+        self.targets_per_jumphost = max(1, self.max_sessions // 2)
+        self._jumphosts: List[_JumphostSlot] = []
+        self._jumphost_lock = threading.Lock()
     
     def _create_jumphost_connection(self) -> SSHClient:
         """
@@ -389,6 +865,79 @@ class JumphostConnectionPool(ConnectionPool):
             self.jumphost_config.key_file
         )
     
+    def _reserve_jumphost(self) -> _JumphostSlot:
+        """
+        Pick a live jumphost transport with spare channel budget, connecting
+        a new one when all are full, and reserve a channel on it.
+        
+        :return: Jumphost slot; release the reservation with _release_jumphost
+        """
+        dead = []
+        with self._jumphost_lock:
+            live = []
+            for slot in self._jumphosts:
+                (live if self._is_transport_active(slot.client) else dead).append(slot)
+            self._jumphosts = live
+            
+            chosen = min(live, key=_JumphostSlot.load, default=None)
+            if chosen is None or chosen.load() >= self.targets_per_jumphost:
+                # Connect under the lock so concurrent callers share the
+                # new transport instead of each opening one
+                chosen = _JumphostSlot(self._create_jumphost_connection())
+                self._jumphosts.append(chosen)
+            self.jumphost_client = self._jumphosts[0].client
+            chosen.reserved += 1
+        
+        for slot in dead:
+            try:
+                slot.client.close()
+            except:
+                pass
+        return chosen
+    
+    def _release_jumphost(self, slot: _JumphostSlot, channel: Optional[Channel]):
+        """
+        Complete a reservation made by _reserve_jumphost.
+        
+        :param slot: Reserved jumphost slot
+        :param channel: Channel opened on it, or None if the open failed
+        """
+        with self._jumphost_lock:
+            slot.reserved -= 1
+            if channel is not None:
+                slot.channels.append(channel)
+    
+    def _open_jumphost_channel(self, target_host: str, target_port: int) -> Channel:
+        """
+        Open a direct-tcpip channel to a target through a jumphost.
+        
+        :param target_host: Target host name
+        :param target_port: Target port number
+        :return: Channel to the target
+        """
+        slot = self._reserve_jumphost()
+        channel = None
+        try:
+            dest_addr = (target_host, target_port)
+            local_addr = ('', 0)  # Let the system choose local port
+            channel = slot.client.get_transport().open_channel("direct-tcpip", dest_addr, local_addr)
+            return channel
+        finally:
+            self._release_jumphost(slot, channel)
+    
+    def clear_pool(self):
+        """Clear all connections, including jumphost connections, from the pool."""
+        super().clear_pool()
+        with self._jumphost_lock:
+            slots = self._jumphosts
+            self._jumphosts = []
+            self.jumphost_client = None
+        for slot in slots:
+            try:
+                slot.client.close()
+            except:
+                pass
+    
     def get_connection_through_jumphost(self, target_host: str, target_port: int, 
                                       target_user: str, password: str = None, 
                                       key_file: str = None) -> SSHClient:
@@ -402,42 +951,89 @@ class JumphostConnectionPool(ConnectionPool):
         :param key_file: Target key file
         :return: SSH client connected through jumphost
         """
-        # Ensure jumphost connection exists
-        if self.jumphost_client is None:
-            self.jumphost_client = self._create_jumphost_connection()
+        # Create channel through a jumphost transport with spare capacity
+        channel = self._open_jumphost_channel(target_host, target_port)
+        return self._connect_over_channel(channel, target_host, target_port,
+                                          target_user, password, key_file)
+    
+    def _connect_over_channel(self, channel: Channel, target_host: str, target_port: int,
+                              target_user: str, password: str = None,
+                              key_file: str = None) -> SSHClient:
+        """
+        Complete the SSH handshake with a target over a jumphost channel.
         
-        # Create transport through jumphost
-        transport = self.jumphost_client.get_transport()
-        dest_addr = (target_host, target_port)
-        local_addr = ('', 0)  # Let the system choose local port
+        :param channel: direct-tcpip channel to the target
+        :param target_host: Target host name
+        :param target_port: Target port number
+        :param target_user: Target username
+        :param password: Target password
+        :param key_file: Target key file
+        :return: SSH client connected through jumphost
+        """
+        # Create SSH client using the channel
+        client = _new_client()
+        
+        try:
+            # Connect through the channel
+            if key_file:
+                client.connect(
+                    hostname=target_host,
+                    port=target_port,
+                    username=target_user,
+                    key_filename=key_file,
+                    sock=channel,
+                    timeout=self.connection_timeout,
+                    transport_factory=_FastTransport,
+                    disabled_algorithms=self.disabled_algorithms
+                )
+            elif password:
+                client.connect(
+                    hostname=target_host,
+                    port=target_port,
+                    username=target_user,
+                    password=password,
+                    sock=channel,
+                    timeout=self.connection_timeout,
+                    transport_factory=_FastTransport,
+                    disabled_algorithms=self.disabled_algorithms
+                )
+            else:
+                raise ValueError("Either password or key_file must be provided")
+        except Exception:
+            # Free the channel's slot on the jumphost transport
+            client.close()
+            channel.close()
+            raise
         
-        # Create channel through jumphost
-        channel = transport.open_channel("direct-tcpip", dest_addr, local_addr)
+        _close_on_collect(client)
+        return client
+    
+    def open_channels_through_jumphost(self, targets: List[Tuple[str, int, str]],
+                                       password: str = None,
+                                       key_file: str = None) -> List[Union[SSHClient, Exception]]:
+        """
+        Connect to many targets through the jumphost at once.
         
-        # Create SSH client using the channel
-        client = SSHClient()
-        client.set_missing_host_key_policy(AutoAddPolicy())
-        
-        # Connect through the channel
-        if key_file:
-            client.connect(
-                hostname=target_host,
-                port=target_port,
-                username=target_user,
-                key_filename=key_file,
-                sock=channel,
-                timeout=self.connection_timeout
-            )
-        elif password:
-            client.connect(
-                hostname=target_host,
-                port=target_port,
-                username=target_user,
-                password=password,
-                sock=channel,
-                timeout=self.connection_timeout
-            )
-        else:
-            raise ValueError("Either password or key_file must be provided")
+        Channel opens and target handshakes for all targets run concurrently
+        and are multiplexed over the jumphost transports, so the batch costs
+        roughly one jumphost round trip plus the slowest handshake rather
+        than the sum over targets.
+        
+        :param targets: (host, port, user) tuples
+        :param password: Target password
+        :param key_file: Target key file
+        :return: SSH client per target, in order, or the exception that target raised
+        """
+        if not targets:
+            return []
+        
+        def connect(target: Tuple[str, int, str]) -> Union[SSHClient, Exception]:
+            host, port, user = target
+            try:
+                return self.get_connection_through_jumphost(host, port, user, password, key_file)
+            except Exception as e:
+                return e
         
-        return client 
\ No newline at end of file
+        workers = min(JUMPHOST_CONNECT_WORKERS, len(targets))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(connect, targets))
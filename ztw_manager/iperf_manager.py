@@ -20,27 +20,402 @@ Example usage:
     print(summary)
 """
 
+import os
 import time
 import threading
 import asyncio
-from typing import Dict, List, Optional, Tuple, Any, Union
+import concurrent.futures
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple, Any, Union
 from dataclasses import dataclass, field
 from datetime import datetime
 import json
 import re
+import shlex
+import hashlib
+import functools
+import itertools
 from pathlib import Path
 import numpy as np
+from paramiko import SSHClient, SFTPClient
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback
+    orjson = None
 
 from .channel_manager import ChannelManager, ChannelCommand, ChannelResult
 from .ssh_manager import SSHManager
+from .connection_pool import JumphostConnectionPool, LOCK_STRIPES
 from .config import Config
 from .logger import StructuredLogger
 
 
 # Author: Vamsi
 
+# Hex SHA-256 digest as printed by sha256sum / shasum -a 256
+_SHA256_HEX_RE = re.compile(r'[0-9a-fA-F]{64}')
+
+# Bandwidth figure in iperf3 text output, e.g. "941 Mbits/sec"
+_BW_RE = re.compile(r'(\d+\.?\d*)\s+([GMK])?bits/sec')
+
+# Throughput percentiles reported by parse_iperf_bytes
+THROUGHPUT_PERCENTILES = [10, 25, 50, 75, 90, 99]
+
+# Seconds between polls while waiting for iperf3 processes to start or exit
+PID_POLL_INTERVAL = 0.5
+
+# Extra seconds an iperf3 client may run past its duration before it is stopped
+PID_WAIT_GRACE = 10
+
+# Concurrent SFTP downloads in collect_many
+COLLECT_WORKERS = 16
+
+# Threads parsing client output in the background of run_iperf_tests
+PARSE_WORKERS = 4
+
+# Local write buffer for downloaded stats files
+DOWNLOAD_BUFFER_SIZE = 1 << 20
+
+# Concurrent writes of per-pair result files
+SAVE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Local write buffer for the per-run NDJSON results file
+RESULTS_BUFFER_SIZE = 1 << 20
+
+# Seconds to wait for a remote sha256sum when verifying a download
+DIGEST_TIMEOUT = 30
+
+# Seconds to wait for a start/stop or poll command to exit
+CONTROL_TIMEOUT = 30
+
+# Seconds to wait for started iperf3 servers to listen before starting clients anyway
+SERVER_START_TIMEOUT = 5
+
+
+class IperfTransferError(Exception):
+    """A downloaded file does not match its remote copy."""
+
+
+class _HashingWriter:
+    """File wrapper that feeds everything written through it to a hash."""
+
+    def __init__(self, f, digest):
+        self._f = f
+        self._digest = digest
+
+    def write(self, data: bytes) -> int:
+        self._digest.update(data)
+        return self._f.write(data)
+
+
+def _percentiles(values: np.ndarray, percentiles: List[float]) -> np.ndarray:
+    """
+    Linearly interpolated percentiles, as np.percentile, from a single
+    partition around the order statistics the percentiles need.
+
+    :param values: 1-D array, not empty
+    :param percentiles: Percentiles in [0, 100]
+    :return: Array of percentile values, in the order given
+    """
+    ranks = np.asarray(percentiles, dtype=np.float64) / 100 * (values.size - 1)
+    lo = np.floor(ranks).astype(np.intp)
+    hi = np.minimum(lo + 1, values.size - 1)
+    part = np.partition(values, np.union1d(lo, hi))
+    return part[lo] + (part[hi] - part[lo]) * (ranks - lo)
+
+
+def _order_stats(values: np.ndarray, ranks: np.ndarray) -> Tuple[float, np.ndarray]:
+    """
+    Mean of values and their linearly interpolated order statistics at the
+    given fractional ranks, by in-place quickselect. Plain Python/NumPy so
+    numba can compile it; see _throughput_stats.
+
+    :param values: 1-D float64 array, not empty; partially reordered
+    :param ranks: Ascending fractional ranks in [0, len(values) - 1]
+    :return: (mean, order statistics)
+    """
+    n = values.shape[0]
+    total = 0.0
+    for i in range(n):
+        total += values[i]
+    out = np.empty(ranks.shape[0])
+    start = 0
+    for r in range(ranks.shape[0]):
+        rank = ranks[r]
+        k = int(rank)
+        # Select k and k + 1; everything left of a selected index is no
+        # larger, so each search starts at the previous one
+        for target in (k, k + 1):
+            if target >= n:
+                break
+            left, right = start, n - 1
+            while right > left:
+                pivot = values[(left + right) // 2]
+                i, j = left, right
+                while i <= j:
+                    while values[i] < pivot:
+                        i += 1
+                    while values[j] > pivot:
+                        j -= 1
+                    if i <= j:
+                        values[i], values[j] = values[j], values[i]
+                        i += 1
+                        j -= 1
+                if target <= j:
+                    right = j
+                elif target >= i:
+                    left = i
+                else:
+                    break
+            start = target
+        value = values[k]
+        if k + 1 < n:
+            value += (values[k + 1] - value) * (rank - k)
+        out[r] = value
+    return total / n, out
+
+
+@functools.lru_cache(maxsize=None)
+def _numba_order_stats():
+    """_order_stats compiled with numba (GIL released), or None without numba."""
+    try:
+        import numba
+    except ImportError:
+        return None
+    return numba.njit(cache=True, nogil=True)(_order_stats)
+
+
+def _throughput_stats(values: np.ndarray, percentiles: List[float]) -> Tuple[float, np.ndarray]:
+    """
+    Mean and percentiles (as np.percentile) of a non-empty array.
+
+    Uses the numba kernel when numba is installed, which also lets
+    parse_iperf_file calls run in parallel threads; NumPy otherwise.
+
+    :param values: 1-D float64 array; may be reordered
+    :param percentiles: Ascending percentiles in [0, 100]
+    :return: (mean, percentile values)
+    """
+    kernel = _numba_order_stats()
+    if kernel is None:
+        return float(values.mean()), _percentiles(values, percentiles)
+    ranks = np.asarray(percentiles, dtype=np.float64) / 100 * (values.size - 1)
+    mean, stats = kernel(values, ranks)
+    return float(mean), stats
+
+
+# Decodes one JSON value starting at an offset, ignoring what follows
+_JSON_DECODER = json.JSONDecoder()
+
+_WHITESPACE_RE = re.compile(r'\s*')
+
+
+def _iperf_sections(text: str, keys: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    """
+    Decode only some top-level members of iperf3 -J output.
+
+    iperf3 prints its JSON with one tab per nesting level, so a top-level
+    key is the only place '\n\t"key":' can appear; each member found there
+    is decoded on its own and the rest of the document (mostly intervals)
+    is never parsed.
+
+    :param text: iperf3 -J output
+    :param keys: Top-level keys to decode; the first one is required
+    :return: Dict of the members found, or None if the first key is missing
+        (e.g. compact JSON not written by iperf3)
+    :raises json.JSONDecodeError: If a member is malformed or truncated
+    """
+    sections = {}
+    for key in keys:
+        idx = text.find(f'\n\t"{key}":')
+        if idx < 0:
+            if not sections:
+                return None
+            continue
+        idx = _WHITESPACE_RE.match(text, idx + len(key) + 5).end()
+        sections[key], _ = _JSON_DECODER.raw_decode(text, idx)
+    return sections
+
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON with orjson when available; both raise json.JSONDecodeError subclasses."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_default(obj: Any) -> Any:
+    """Stdlib json fallback for types orjson serializes natively."""
+    if isinstance(obj, datetime):
+        # Same text orjson writes for naive datetimes
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize obj as indented JSON; datetimes become ISO 8601 strings."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, default=_json_default).encode()
+
+
+def _json_line(obj: Any) -> bytes:
+    """Serialize obj as one compact NDJSON line."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj, separators=(",", ":"), default=_json_default).encode() + b"\n"
+
+
+def _run_coroutine(coro):
+    """
+    Run a coroutine to completion from synchronous code.
+
+    asyncio.run() refuses to start inside a running event loop, so when the
+    caller already has one the coroutine runs on its own loop in a worker
+    thread, and the call still blocks until it finishes.
+
+    :param coro: Coroutine to run
+    :return: The coroutine's result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def _write_atomic(filename: str, data: bytes, fsync: bool = False):
+    """
+    Write a file through a temporary sibling and os.replace, so readers
+    never see a partially written file.
+
+    :param filename: Destination path
+    :param data: File contents
+    :param fsync: Flush the data to disk before the rename
+    """
+    tmp = f"{filename}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, filename)
+
+
+def _pair_keys(client_server_pairs: List[Tuple[str, str]]) -> List[str]:
+    """Result keys ("client_to_server") of the pairs, in order."""
+    return [f"{client_host}_to_{server_host}" for client_host, server_host in client_server_pairs]
+
+
+class _IperfPaths(NamedTuple):
+    """Remote output and PID file of one iperf3 process."""
+    output: str
+    pid: str
+
+
+def _server_paths(server_tag: str) -> _IperfPaths:
+    """Remote files of the iperf3 server for server_tag (the host, plus a port suffix when shared)."""
+    base = f"/tmp/iperf_server_{server_tag}"
+    return _IperfPaths(f"{base}.json", f"{base}.pid")
+
 
-@dataclass
+def _client_paths(client_host: str, server_host: str = None) -> _IperfPaths:
+    """Remote files of the iperf3 client on client_host testing against server_host."""
+    base = f"/tmp/iperf_client_{client_host}" if server_host is None else \
+        f"/tmp/iperf_client_{client_host}_to_{server_host}"
+    return _IperfPaths(f"{base}.json", f"{base}.pid")
+
+
+def _server_start_cmd(port: int, output_file: str, pid_file: str) -> str:
+    """Shell command starting a background iperf3 server and recording its PID."""
+    return f"nohup iperf3 -s -J -p {port} > {output_file} 2>&1 & echo $! > {pid_file}"
+
+
+def _client_tuning_flags(config: 'IperfTestConfig') -> str:
+    """
+    iperf3 client flags for high-rate tests: -A pins the client to a CPU,
+    -Z sends with sendfile, and --get-server-output embeds the server's
+    JSON in the client's as server_output_json. All are opt-in, so default
+    configs keep the plain client command line.
+    """
+    flags = []
+    if config.cpu_affinity is not None:
+        flags.append(f"-A {config.cpu_affinity}")
+    if config.zerocopy:
+        flags.append("-Z")
+    if config.get_server_output:
+        flags.append("--get-server-output")
+    return " ".join(flags)
+
+
+def _client_cmd(server_host: str, port: int, duration: int, parallel_streams: int,
+                mtu_size: int, interval: int, flags: str = "") -> str:
+    """Foreground iperf3 client command writing JSON to stdout."""
+    cmd = (f"iperf3 -c {server_host} -p {port} -O1 -P {parallel_streams} -M {mtu_size} "
+           f"-t {duration} -i {interval} -J")
+    return f"{cmd} {flags}" if flags else cmd
+
+
+def _client_start_cmd(server_host: str, port: int, duration: int, parallel_streams: int,
+                      mtu_size: int, interval: int, output_file: str, pid_file: str,
+                      flags: str = "") -> str:
+    """Shell command starting a background iperf3 client and recording its PID."""
+    cmd = _client_cmd(server_host, port, duration, parallel_streams, mtu_size, interval, flags)
+    return f"nohup {cmd} > {output_file} 2>&1 & echo $! > {pid_file}"
+
+
+def _stop_cmd(pid_file: str) -> str:
+    """Shell command killing the process recorded in a PID file."""
+    return f"if [ -f {pid_file} ]; then kill -9 $(cat {pid_file}) && rm -f {pid_file}; fi"
+
+
+def _all_exited_cmd(pid_files: List[str]) -> str:
+    """Shell command that succeeds once none of the recorded processes is alive."""
+    files = " ".join(pid_files)
+    return f"for f in {files}; do kill -0 $(cat $f) 2>/dev/null && exit 1; done; exit 0"
+
+
+def _all_listening_cmd(ports: List[int]) -> str:
+    """Shell command that succeeds once every port has a listening TCP socket."""
+    ports = " ".join(str(port) for port in ports)
+    return f'for p in {ports}; do ss -Hltn "sport = :$p" | grep -q . || exit 1; done'
+
+
+# Characters special in the extended regexes pgrep matches with
+_ERE_SPECIAL_RE = re.compile(r'([.\[\]()*+?{}|^$\\])')
+
+
+def _clients_exited_cmd(client_cmds: List[str]) -> str:
+    """
+    Shell command that succeeds once none of the given iperf3 client command
+    lines is running. Matching the whole command line, anchored, leaves other
+    iperf3 clients on the host (and the shell running this command) alone.
+    """
+    patterns = ("^" + _ERE_SPECIAL_RE.sub(r"\\\1", cmd) + "$" for cmd in client_cmds)
+    checks = "; ".join(f"pgrep -f {shlex.quote(pattern)} > /dev/null && exit 1" for pattern in patterns)
+    return f"{checks}; exit 0"
+
+
+def _client_cmd_template(config: 'IperfTestConfig') -> str:
+    """Foreground iperf3 client command for config, with a {server} placeholder."""
+    cmd_template = (f"iperf3 -c {{server}} -O1 -P {config.parallel_streams} "
+                    f"-M {config.mtu_size} -t {config.test_duration} -i {config.interval} -J")
+    flags = _client_tuning_flags(config)
+    return f"{cmd_template} {flags}" if flags else cmd_template
+
+
+def _batch_start_cmd(start_cmds: List[str], pid_files: List[str]) -> str:
+    """
+    Join background start commands into one script that succeeds only if
+    every started process is still alive shortly afterwards.
+    """
+    pids = " ".join(f"$(cat {pid_file})" for pid_file in pid_files)
+    return "; ".join(start_cmds) + f"; sleep 0.2; kill -0 {pids}"
+
+
+@dataclass(slots=True)
 class IperfTestConfig:
     """Configuration for iperf test."""
     test_duration: int = 60
@@ -51,9 +426,17 @@ class IperfTestConfig:
     output_dir: str = "iperf_results"
     preserve_channels: bool = True
     capture_output: bool = True
+    cpu_affinity: Optional[int] = None  # iperf3 -A
+    zerocopy: bool = False  # iperf3 -Z
+    get_server_output: bool = False  # iperf3 --get-server-output; no separate server file fetch
+    ndjson_results: bool = False  # one NDJSON file per run instead of an indented JSON file per pair
+    verify_transfers: bool = True  # compare SHA-256 of downloaded stats files with the remote copy
+    keep_parsed_output: bool = False  # parse whole client JSON and keep it on IperfTestResult.parsed
+    max_retained_results: int = 10_000  # most recent results kept in IperfManager.test_results
+    fsync_results: bool = False  # fsync saved result files before renaming them into place
 
 
-@dataclass
+@dataclass(slots=True)
 class IperfTestResult:
     """Result of an iperf test."""
     client_host: str
@@ -67,7 +450,12 @@ class IperfTestResult:
     duration: float
     success: bool
     metrics: Dict[str, Any] = field(default_factory=dict)
-    raw_output: str = ""
+    parsed: Optional[Dict[str, Any]] = field(default=None, repr=False)  # iperf3 JSON document, once parsed
+
+    @property
+    def raw_output(self) -> str:
+        """Raw command output; always the same string as output."""
+        return self.output
 
 
 class IperfManager:
@@ -87,12 +475,29 @@ class IperfManager:
         
         # Test state
         self.active_tests: Dict[str, Dict[str, Any]] = {}
-        self.test_results: List[IperfTestResult] = []
+        # Bounded so long-running monitors don't grow without limit
+        self.test_results: Deque[IperfTestResult] = deque(maxlen=config.max_retained_results or None)
+        # Running totals over test_results for get_test_summary; updated
+        # with test_results under self.test_lock by _record_result
+        self._summary_stats = {'total': 0, 'success': 0, 'bw_sum': 0.0, 'bw_n': 0}
+        # Written only through _mark_preserved, under the host's lock stripe
         self.channels_preserved: Dict[str, bool] = {}
         
-        # Threading
-        self.lock = threading.RLock()
-        self.test_lock = threading.RLock()
+        # One SSH client (and SFTP session) per host, reused for every
+        # start/stop/collect command; self.lock only guards short dict
+        # updates and a striped per-host lock serializes opening a session
+        self._host_clients: Dict[str, SSHClient] = {}
+        self._sftp_clients: Dict[str, SFTPClient] = {}
+        self._host_stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        
+        # Client output parses still running; _collect_results waits on them.
+        # The parse workers are created on first use and shut down in close()
+        self._pending_parses: List[concurrent.futures.Future] = []
+        self._parse_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        
+        # Threading; neither lock is ever taken while holding itself
+        self.lock = threading.Lock()
+        self.test_lock = threading.Lock()
         
         # Create output directory
         Path(config.output_dir).mkdir(parents=True, exist_ok=True)
@@ -118,14 +523,17 @@ class IperfManager:
         # Wait a bit for servers to start
         time.sleep(2)
         
+        # Result keys, formatted once for every step below
+        pair_keys = _pair_keys(client_server_pairs)
+        
         # Start iperf clients
-        client_results = self._start_iperf_clients(client_server_pairs, test_config)
+        client_results = self._start_iperf_clients(client_server_pairs, test_config, pair_keys)
         
         # Wait for tests to complete
-        self._wait_for_tests_completion(client_server_pairs, test_config)
+        self._wait_for_tests_completion(client_server_pairs, test_config, client_results, pair_keys)
         
         # Collect and process results
-        all_results = self._collect_results(client_server_pairs, server_results, client_results)
+        all_results = self._collect_results(client_server_pairs, server_results, client_results, pair_keys)
         
         return all_results
     
@@ -133,15 +541,13 @@ class IperfManager:
         """Start iperf servers on server hosts."""
         server_results = {}
         
-        # Create server commands
-        server_commands = []
-        for server_host in server_hosts:
-            cmd = f"iperf3 -s -J -i {config.interval}"
-            server_commands.append(ChannelCommand(
-                command=cmd,
-                timeout=config.test_duration + 30,  # Extra time for startup
-                wait_for_prompt=False  # Server runs continuously
-            ))
+        # Every host runs the whole chain, and the server command is the same
+        # for all of them, so one command covers every server host
+        server_commands = [ChannelCommand(
+            command=f"iperf3 -s -J -i {config.interval}",
+            timeout=config.test_duration + 30,  # Extra time for startup
+            wait_for_prompt=False  # Server runs continuously
+        )]
         
         # Execute server commands
         self.logger.info("Starting iperf servers...")
@@ -152,7 +558,9 @@ class IperfManager:
             create_new_channel=True  # New channel for each server
         )
         
-        # Process server results
+        # Process server results; the chain call has returned, so one
+        # timestamp serves as every server's end time
+        end_time = datetime.now()
         for server_host, results in server_chain_results.items():
             if results and len(results) > 0:
                 result = results[0]  # Server command result
@@ -164,33 +572,35 @@ class IperfManager:
                     output=result.output,
                     error=result.error,
                     start_time=result.timestamp,
-                    end_time=datetime.now(),
+                    end_time=end_time,
                     duration=result.duration,
-                    success=result.success,
-                    raw_output=result.output
+                    success=result.success
                 )
                 
                 # Mark channel as preserved
                 if config.preserve_channels:
-                    self.channels_preserved[server_host] = True
+                    self._mark_preserved(server_host)
         
         return server_results
     
     def _start_iperf_clients(self, client_server_pairs: List[Tuple[str, str]], 
-                           config: IperfTestConfig) -> Dict[str, IperfTestResult]:
+                           config: IperfTestConfig,
+                           pair_keys: List[str] = None) -> Dict[str, IperfTestResult]:
         """Start iperf clients on client hosts."""
         client_results = {}
+        pair_keys = pair_keys or _pair_keys(client_server_pairs)
         
         # Create client commands
         client_commands = []
         client_hosts = []
         
+        # Only the server varies per pair, so the rest of the command is
+        # formatted once
+        cmd_template = _client_cmd_template(config)
+        
         for client_host, server_host in client_server_pairs:
-            cmd = (f"iperf3 -c {server_host} -O1 -P {config.parallel_streams} "
-                   f"-M {config.mtu_size} -t {config.test_duration} -i {config.interval} -J")
-            
             client_commands.append(ChannelCommand(
-                command=cmd,
+                command=cmd_template.format(server=server_host),
                 timeout=config.test_duration + 60,  # Extra time for completion
                 wait_for_prompt=True
             ))
@@ -205,15 +615,15 @@ class IperfManager:
             create_new_channel=True  # New channel for each client
         )
         
-        # Process client results
+        # Process client results; output is parsed on worker threads while
+        # the tests are waited on, and _collect_results joins them
+        executor = self._parse_pool()
+        end_time = datetime.now()
         for i, (client_host, server_host) in enumerate(client_server_pairs):
             if client_host in client_chain_results and client_chain_results[client_host]:
                 result = client_chain_results[client_host][0]  # Client command result
                 
-                # Parse iperf output for metrics
-                metrics = self._parse_iperf_output(result.output)
-                
-                client_results[f"{client_host}_to_{server_host}"] = IperfTestResult(
+                test_result = IperfTestResult(
                     client_host=client_host,
                     server_host=server_host,
                     test_type="client",
@@ -221,62 +631,90 @@ class IperfManager:
                     output=result.output,
                     error=result.error,
                     start_time=result.timestamp,
-                    end_time=datetime.now(),
+                    end_time=end_time,
                     duration=result.duration,
-                    success=result.success,
-                    metrics=metrics,
-                    raw_output=result.output
+                    success=result.success
                 )
                 
+                # Parse iperf output for metrics; with keep_parsed_output the
+                # JSON document is kept on the result for parse_iperf_file(data=...)
+                self._pending_parses.append(
+                    executor.submit(self._parse_into, test_result, config.keep_parsed_output))
+                client_results[pair_keys[i]] = test_result
+                
                 # Mark channel as preserved
                 if config.preserve_channels:
-                    self.channels_preserved[client_host] = True
+                    self._mark_preserved(client_host)
         
         return client_results
     
-    def _wait_for_tests_completion(self, client_server_pairs: List[Tuple[str, str]], 
-                                 config: IperfTestConfig):
-        """Wait for all tests to complete."""
-        self.logger.info(f"Waiting for tests to complete ({config.test_duration} seconds)...")
-        
-        # Wait for the test duration plus some buffer
-        time.sleep(config.test_duration + 10)
-        
-        # Check if tests are still running
-        self._check_test_status(client_server_pairs)
+    def _parse_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        """Return the manager's parse executor, creating it on first use."""
+        with self.lock:
+            if self._parse_executor is None:
+                self._parse_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=PARSE_WORKERS)
+            return self._parse_executor
     
-    def _check_test_status(self, client_server_pairs: List[Tuple[str, str]]):
-        """Check the status of running tests."""
-        for client_host, server_host in client_server_pairs:
-            # Check if iperf processes are still running
-            check_cmd = "ps aux | grep iperf3 | grep -v grep"
-            
+    def _parse_into(self, result: IperfTestResult, keep_parsed: bool = False):
+        """Parse a result's output into its metrics, keeping the document if keep_parsed."""
+        result.metrics = self._parse_iperf_output(result.output, result if keep_parsed else None)
+    
+    def _wait_for_parses(self):
+        """Block until background client output parses have finished."""
+        pending, self._pending_parses = self._pending_parses, []
+        for future in pending:
             try:
-                # Check client
-                client_result = self.ssh_manager.execute_command(
-                    check_cmd, hosts=[client_host]
-                )
-                if client_result:
-                    self.logger.debug(f"Client {client_host} iperf status: {client_result[0].output}")
-                
-                # Check server
-                server_result = self.ssh_manager.execute_command(
-                    check_cmd, hosts=[server_host]
-                )
-                if server_result:
-                    self.logger.debug(f"Server {server_host} iperf status: {server_result[0].output}")
-                    
+                future.result()
             except Exception as e:
-                self.logger.warning(f"Error checking test status for {client_host}-{server_host}: {e}")
+                self.logger.warning(f"Failed to parse iperf output: {e}")
+    
+    def _wait_for_tests_completion(self, client_server_pairs: List[Tuple[str, str]], 
+                                 config: IperfTestConfig,
+                                 client_results: Dict[str, IperfTestResult] = None,
+                                 pair_keys: List[str] = None):
+        """
+        Wait for all tests to complete.
+        
+        :param client_server_pairs: List of (client_host, server_host) tuples
+        :param config: Test configuration
+        :param client_results: Results from _start_iperf_clients; clients that
+            returned successfully ran in the foreground and have already exited
+        :param pair_keys: Result keys of client_server_pairs, from _pair_keys
+        """
+        client_results = client_results or {}
+        pair_keys = pair_keys or _pair_keys(client_server_pairs)
+        cmd_template = _client_cmd_template(config)
+        client_cmds: Dict[str, List[str]] = {}
+        for (client_host, server_host), pair_key in zip(client_server_pairs, pair_keys):
+            result = client_results.get(pair_key)
+            if result is None or not result.success:
+                client_cmds.setdefault(client_host, []).append(cmd_template.format(server=server_host))
+        if not client_cmds:
+            self.logger.info("All iperf clients have completed")
+            return
+        
+        self.logger.info(f"Waiting for tests to complete (up to {config.test_duration + PID_WAIT_GRACE} seconds)...")
+        
+        # Poll until none of this run's clients is left on any client host,
+        # bounded by the test duration plus some buffer
+        still_running = _run_coroutine(self._poll_until(
+            {host: _clients_exited_cmd(cmds) for host, cmds in client_cmds.items()},
+            config.test_duration + PID_WAIT_GRACE
+        ))
+        if still_running:
+            self.logger.warning(f"iperf3 clients still running on {still_running}")
     
     def _collect_results(self, client_server_pairs: List[Tuple[str, str]], 
                         server_results: Dict[str, IperfTestResult],
-                        client_results: Dict[str, IperfTestResult]) -> Dict[str, List[IperfTestResult]]:
+                        client_results: Dict[str, IperfTestResult],
+                        pair_keys: List[str] = None) -> Dict[str, List[IperfTestResult]]:
         """Collect and organize test results."""
+        self._wait_for_parses()
         all_results = {}
+        pair_keys = pair_keys or _pair_keys(client_server_pairs)
         
-        for client_host, server_host in client_server_pairs:
-            pair_key = f"{client_host}_to_{server_host}"
+        for (client_host, server_host), pair_key in zip(client_server_pairs, pair_keys):
             pair_results = []
             
             # Add server result if available
@@ -288,69 +726,121 @@ class IperfManager:
                 pair_results.append(client_results[pair_key])
             
             all_results[pair_key] = pair_results
-            
-            # Save results to file
-            self._save_test_results(pair_key, pair_results)
+        
+        # Record each result once; a server result can be shared by pairs
+        for result in server_results.values():
+            self._record_result(result)
+        for result in client_results.values():
+            self._record_result(result)
+        
+        # Save results to file
+        if self.config.ndjson_results:
+            self._save_results_ndjson(all_results)
+        else:
+            # File writes release the GIL, so pairs are saved concurrently
+            workers = min(len(all_results), SAVE_WORKERS) or 1
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(lambda item: self._save_test_results(*item, timestamp=timestamp),
+                                  all_results.items()))
         
         return all_results
     
-    def _save_test_results(self, pair_key: str, results: List[IperfTestResult]):
-        """Save test results to file."""
+    def _save_results_ndjson(self, all_results: Dict[str, List[IperfTestResult]]):
+        """Save every result of a run to one NDJSON file, one result per line."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{self.config.output_dir}/{pair_key}_{timestamp}.json"
+        filename = f"{self.config.output_dir}/results_{timestamp}.ndjson"
         
-        data = []
-        for result in results:
-            data.append({
-                'client_host': result.client_host,
-                'server_host': result.server_host,
-                'test_type': result.test_type,
-                'command': result.command,
-                'output': result.output,
-                'error': result.error,
-                'start_time': result.start_time.isoformat(),
-                'end_time': result.end_time.isoformat(),
-                'duration': result.duration,
-                'success': result.success,
-                'metrics': result.metrics,
-                'raw_output': result.raw_output
-            })
+        # Written under a temporary name and renamed, as in _write_atomic
+        tmp = f"{filename}.tmp"
+        with open(tmp, 'wb', buffering=RESULTS_BUFFER_SIZE) as f:
+            for pair_key, results in all_results.items():
+                for result in results:
+                    record = self._result_record(result)
+                    record['pair'] = pair_key
+                    f.write(_json_line(record))
+            if self.config.fsync_results:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, filename)
+        
+        self.logger.info(f"Saved results to {filename}")
+    
+    def _save_test_results(self, pair_key: str, results: List[IperfTestResult], timestamp: str = None):
+        """Save test results to file; timestamp (YYYYmmdd_HHMMSS) defaults to now."""
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{self.config.output_dir}/{pair_key}_{timestamp}.json"
         
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        data = [self._result_record(result) for result in results]
+        _write_atomic(filename, _json_dumps(data), self.config.fsync_results)
         
         self.logger.info(f"Saved results to {filename}")
     
-    def _parse_iperf_output(self, output: str) -> Dict[str, Any]:
-        """Parse iperf output to extract metrics."""
-        metrics = {}
+    @staticmethod
+    def _result_record(result: IperfTestResult) -> Dict[str, Any]:
+        """JSON-ready dict for a saved test result."""
+        return {
+            'client_host': result.client_host,
+            'server_host': result.server_host,
+            'test_type': result.test_type,
+            'command': result.command,
+            'output': result.output,
+            'error': result.error,
+            'start_time': result.start_time,
+            'end_time': result.end_time,
+            'duration': result.duration,
+            'success': result.success,
+            'metrics': result.metrics,
+            # Same text as output; kept for readers of the saved schema
+            'raw_output': result.raw_output
+        }
+    
+    def _parse_iperf_output(self, output: str, result: IperfTestResult = None) -> Dict[str, Any]:
+        """
+        Parse iperf output to extract metrics.
+        
+        Only the "end" and "connection" members are decoded, unless result is
+        given: then the whole JSON document is parsed and cached on result.parsed.
+        """
+        # iperf3 -J output is a single object; anything else is text output.
+        # Sniff the first non-blank character in place rather than lstrip()
+        # copying a multi-MB text blob just to look at it.
+        start = _WHITESPACE_RE.match(output).end()
+        if not output.startswith('{', start):
+            return self._parse_iperf_text_output(output)
+        stripped = output[start:]
         
         try:
-            # Try to parse as JSON first
-            data = json.loads(output)
-            
-            if 'end' in data and 'streams' in data['end']:
-                # Extract bandwidth metrics
-                sum_sent = data['end']['sum_sent']
-                sum_received = data['end']['sum_received']
-                
-                metrics['bandwidth_sent_mbps'] = sum_sent.get('bits_per_second', 0) / 1_000_000
-                metrics['bandwidth_received_mbps'] = sum_received.get('bits_per_second', 0) / 1_000_000
-                metrics['bytes_sent'] = sum_sent.get('bytes', 0)
-                metrics['bytes_received'] = sum_received.get('bytes', 0)
-                metrics['retransmits'] = sum_sent.get('retransmits', 0)
-                
-                # Extract connection info
-                if 'connection' in data:
-                    metrics['local_host'] = data['connection'].get('local_host', '')
-                    metrics['local_port'] = data['connection'].get('local_port', '')
-                    metrics['remote_host'] = data['connection'].get('remote_host', '')
-                    metrics['remote_port'] = data['connection'].get('remote_port', '')
-                
-        except (json.JSONDecodeError, KeyError):
-            # Fallback to text parsing
+            data = _iperf_sections(stripped, ('end', 'connection')) if result is None else None
+            if data is None:
+                data = _json_loads(stripped)
+                if result is not None:
+                    result.parsed = data
+        except json.JSONDecodeError:
+            # Truncated JSON, e.g. a test cut short; fall back to text parsing
             self.logger.warning("Failed to parse iperf JSON output, falling back to text parsing")
-            metrics = self._parse_iperf_text_output(output)
+            return self._parse_iperf_text_output(output)
+        
+        metrics = {}
+        end = data.get('end') or {}
+        if 'streams' in end:
+            # Extract bandwidth metrics
+            sum_sent = end.get('sum_sent') or {}
+            sum_received = end.get('sum_received') or {}
+            
+            metrics['bandwidth_sent_mbps'] = sum_sent.get('bits_per_second', 0) / 1_000_000
+            metrics['bandwidth_received_mbps'] = sum_received.get('bits_per_second', 0) / 1_000_000
+            metrics['bytes_sent'] = sum_sent.get('bytes', 0)
+            metrics['bytes_received'] = sum_received.get('bytes', 0)
+            metrics['retransmits'] = sum_sent.get('retransmits', 0)
+            
+            # Extract connection info
+            connection = data.get('connection')
+            if connection:
+                metrics['local_host'] = connection.get('local_host', '')
+                metrics['local_port'] = connection.get('local_port', '')
+                metrics['remote_host'] = connection.get('remote_host', '')
+                metrics['remote_port'] = connection.get('remote_port', '')
         
         return metrics
     
@@ -359,8 +849,7 @@ class IperfManager:
         metrics = {}
         
         # Extract bandwidth from text output
-        bandwidth_pattern = r'(\d+\.?\d*)\s+(G|M|K)?bits/sec'
-        match = re.search(bandwidth_pattern, output)
+        match = _BW_RE.search(output)
         if match:
             value = float(match.group(1))
             unit = match.group(2) or 'M'
@@ -386,18 +875,56 @@ class IperfManager:
     
     def get_preserved_channels(self) -> Dict[str, bool]:
         """Get information about preserved channels."""
+        # Copying a dict is a single step under the GIL, so writers on
+        # other stripes can't be seen half-done
         return dict(self.channels_preserved)
     
+    def _mark_preserved(self, host: str):
+        """
+        Record that a host's channel is kept open after its test.
+        
+        :param host: Host whose channel is preserved
+        """
+        with self._host_lock(host):
+            self.channels_preserved[host] = True
+    
+    def _record_result(self, result: IperfTestResult):
+        """
+        Append a result to test_results and update the summary totals,
+        backing out the result the bounded deque drops, if any.
+        
+        :param result: Finished test result, metrics already parsed
+        """
+        with self.test_lock:
+            results = self.test_results
+            if results.maxlen is not None and len(results) == results.maxlen:
+                self._update_summary_stats(results[0], -1)
+            results.append(result)
+            self._update_summary_stats(result, 1)
+    
+    def _update_summary_stats(self, result: IperfTestResult, sign: int):
+        """Add (sign=1) or remove (sign=-1) a result's share of the summary totals."""
+        stats = self._summary_stats
+        stats['total'] += sign
+        if result.success:
+            stats['success'] += sign
+            if result.test_type == 'client':
+                stats['bw_sum'] += sign * result.metrics.get('bandwidth_received_mbps', 0)
+                stats['bw_n'] += sign
+                if not stats['bw_n']:
+                    # Drop rounding residue left by subtracting evicted results
+                    stats['bw_sum'] = 0.0
+    
     def get_test_summary(self) -> Dict[str, Any]:
-        """Get summary of all test results."""
-        total_tests = len(self.test_results)
-        successful_tests = sum(1 for r in self.test_results if r.success)
+        """Get summary of the retained test results."""
+        with self.test_lock:
+            stats = dict(self._summary_stats)
+        total_tests = stats['total']
+        successful_tests = stats['success']
         failed_tests = total_tests - successful_tests
         
         # Calculate average bandwidth
-        bandwidths = [r.metrics.get('bandwidth_received_mbps', 0) for r in self.test_results 
-                     if r.test_type == 'client' and r.success]
-        avg_bandwidth = sum(bandwidths) / len(bandwidths) if bandwidths else 0
+        avg_bandwidth = stats['bw_sum'] / stats['bw_n'] if stats['bw_n'] else 0
         
         return {
             'total_tests': total_tests,
@@ -411,83 +938,325 @@ class IperfManager:
     def export_results_summary(self, filename: str):
         """Export a summary of all test results."""
         summary = self.get_test_summary()
-        
-        with open(filename, 'w') as f:
-            json.dump(summary, f, indent=2)
+        _write_atomic(filename, _json_dumps(summary), self.config.fsync_results)
         
         self.logger.info(f"Exported test summary to {filename}")
 
+    def _client(self, host: str) -> SSHClient:
+        """
+        Get the cached SSH client for a host, fetching it from the pool once.
+        
+        :param host: Target host
+        :return: SSH client
+        """
+        with self.lock:
+            client = self._host_clients.get(host)
+        transport = client.get_transport() if client is not None else None
+        if transport is not None and transport.is_active():
+            return client
+        
+        # Connect outside the lock so other hosts aren't held up
+        config = self.ssh_manager.config
+        pool = self.ssh_manager.connection_pool
+        if isinstance(pool, JumphostConnectionPool):
+            client = pool.get_connection_through_jumphost(
+                host, config.port, config.user, config.password, config.key_file
+            )
+        else:
+            client = pool.get_connection(
+                host, config.port, config.user, config.password, config.key_file
+            )
+        with self.lock:
+            # An SFTP session on the old transport is useless too
+            self._sftp_clients.pop(host, None)
+            self._host_clients[host] = client
+        return client
+    
+    def _sftp(self, host: str) -> SFTPClient:
+        """
+        Get the cached SFTP session for a host.
+        
+        :param host: Target host
+        :return: SFTP client on the host's cached SSH client
+        """
+        client = self._client(host)
+        with self.lock:
+            sftp = self._sftp_clients.get(host)
+        if sftp is not None:
+            return sftp
+        
+        # Open under the host's stripe only, so hosts don't wait on each
+        # other's SFTP handshake
+        with self._host_lock(host):
+            with self.lock:
+                sftp = self._sftp_clients.get(host)
+            if sftp is None:
+                sftp = client.open_sftp()
+                with self.lock:
+                    self._sftp_clients[host] = sftp
+            return sftp
+    
+    def _host_lock(self, host: str) -> threading.Lock:
+        """
+        Get the lock stripe for a host.
+        
+        :param host: Target host
+        :return: Lock serializing session setup and channels_preserved
+                 updates on that host
+        """
+        return self._host_stripes[hash(host) % LOCK_STRIPES]
+    
+    def _drop_client(self, host: str):
+        """
+        Forget a host's cached clients after an error so the next call reconnects.
+        
+        :param host: Target host
+        """
+        with self.lock:
+            self._host_clients.pop(host, None)
+            sftp = self._sftp_clients.pop(host, None)
+        if sftp is not None:
+            try:
+                sftp.close()
+            except Exception:
+                pass
+    
+    def _ssh_exec(self, host: str, cmd: str, timeout: float = CONTROL_TIMEOUT) -> bool:
+        """
+        Run a short control command on a host over its cached connection.
+        
+        :param host: Target host
+        :param cmd: Shell command
+        :param timeout: Seconds to wait for the command to exit
+        :return: True if the command exited with status 0 within the timeout
+        """
+        try:
+            channel = self._client(host).get_transport().open_session()
+            try:
+                channel.settimeout(timeout)
+                channel.exec_command(cmd)
+                # recv_exit_status() waits forever on a hung host or a
+                # background command still holding the session open
+                if not channel.status_event.wait(timeout):
+                    self.logger.warning(f"Command timed out on {host} after {timeout}s")
+                    return False
+                return channel.recv_exit_status() == 0
+            finally:
+                channel.close()
+        except Exception as e:
+            self.logger.warning(f"Command failed on {host}: {e}")
+            self._drop_client(host)
+            return False
+    
+    def _ssh_exec_output(self, host: str, cmd: str, timeout: float) -> Tuple[int, bytes]:
+        """
+        Run a command on a host's cached connection and capture its stdout.
+        
+        :param host: Target host
+        :param cmd: Shell command
+        :param timeout: Seconds to wait for output before giving up
+        :return: (exit status, stdout bytes); exit status is -1 on failure
+        """
+        try:
+            channel = self._client(host).get_transport().open_session()
+            try:
+                channel.settimeout(timeout)
+                channel.exec_command(cmd)
+                output = channel.makefile('rb').read()
+                return channel.recv_exit_status(), output
+            finally:
+                channel.close()
+        except Exception as e:
+            self.logger.warning(f"Command failed on {host}: {e}")
+            self._drop_client(host)
+            return -1, b""
+    
+    def close(self):
+        """
+        Finish outstanding output parses, close cached SFTP sessions and
+        release cached clients.
+        
+        The SSH connections themselves belong to the SSH manager's pool and
+        are closed with it.
+        """
+        self._wait_for_parses()
+        with self.lock:
+            executor, self._parse_executor = self._parse_executor, None
+            sftp_clients = list(self._sftp_clients.values())
+            self._sftp_clients.clear()
+            self._host_clients.clear()
+        if executor is not None:
+            executor.shutdown(wait=True)
+        for sftp in sftp_clients:
+            try:
+                sftp.close()
+            except Exception:
+                pass
+    
+    async def _poll_until(self, scripts: Dict[str, str], timeout: float) -> List[str]:
+        """
+        Rerun one check script per host until each has succeeded once.
+        
+        :param scripts: Mapping of host to a check script that exits 0 when done
+        :param timeout: Maximum seconds to keep polling
+        :return: Hosts whose check never succeeded
+        """
+        pending = dict(scripts)
+        deadline = time.monotonic() + timeout
+        while pending:
+            hosts = list(pending)
+            # A round never runs past the deadline, even on a hung host
+            round_timeout = max(deadline - time.monotonic(), PID_POLL_INTERVAL)
+            done = await asyncio.gather(*(asyncio.to_thread(self._ssh_exec, host, pending[host], round_timeout)
+                                          for host in hosts))
+            for host, ok in zip(hosts, done):
+                if ok:
+                    del pending[host]
+            if not pending or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(PID_POLL_INTERVAL)
+        return list(pending)
+
     def start_iperf_server(self, server_host: str, port: int = 5201, output_file: str = None, pid_file: str = None) -> bool:
         """
         Start iperf3 server in background on the server_host, output to file, save PID.
         """
-        output_file = output_file or f"/tmp/iperf_server_{server_host}.json"
-        pid_file = pid_file or f"/tmp/iperf_server_{server_host}.pid"
-        cmd = f"nohup iperf3 -s -J -p {port} > {output_file} 2>&1 & echo $! > {pid_file}"
-        result = self.ssh_manager.execute_command(cmd, hosts=[server_host])
+        paths = _server_paths(server_host)
+        output_file = output_file or paths.output
+        pid_file = pid_file or paths.pid
+        cmd = _server_start_cmd(port, output_file, pid_file)
+        success = self._ssh_exec(server_host, cmd)
         self.logger.info(f"Started iperf3 server on {server_host}, output: {output_file}, pid: {pid_file}")
-        return result[0].success if result else False
+        return success
 
     def stop_iperf_server(self, server_host: str, pid_file: str = None) -> bool:
         """
         Stop iperf3 server on the server_host using the PID file.
         """
-        pid_file = pid_file or f"/tmp/iperf_server_{server_host}.pid"
-        cmd = f"if [ -f {pid_file} ]; then kill -9 $(cat {pid_file}) && rm -f {pid_file}; fi"
-        result = self.ssh_manager.execute_command(cmd, hosts=[server_host])
+        pid_file = pid_file or _server_paths(server_host).pid
+        cmd = _stop_cmd(pid_file)
+        success = self._ssh_exec(server_host, cmd)
         self.logger.info(f"Stopped iperf3 server on {server_host}, pid file: {pid_file}")
-        return result[0].success if result else False
+        return success
 
     def start_iperf_client(self, client_host: str, server_host: str, port: int = 5201, duration: int = 60, output_file: str = None, pid_file: str = None, parallel_streams: int = 1, mtu_size: int = 1460, interval: int = 2) -> bool:
         """
         Start iperf3 client in background on the client_host, output to file, save PID.
         """
-        output_file = output_file or f"/tmp/iperf_client_{client_host}_to_{server_host}.json"
-        pid_file = pid_file or f"/tmp/iperf_client_{client_host}_to_{server_host}.pid"
-        cmd = (f"nohup iperf3 -c {server_host} -p {port} -O1 -P {parallel_streams} -M {mtu_size} "
-               f"-t {duration} -i {interval} -J > {output_file} 2>&1 & echo $! > {pid_file}")
-        result = self.ssh_manager.execute_command(cmd, hosts=[client_host])
+        paths = _client_paths(client_host, server_host)
+        output_file = output_file or paths.output
+        pid_file = pid_file or paths.pid
+        cmd = _client_start_cmd(server_host, port, duration, parallel_streams, mtu_size, interval,
+                                output_file, pid_file, _client_tuning_flags(self.config))
+        success = self._ssh_exec(client_host, cmd)
         self.logger.info(f"Started iperf3 client on {client_host} to {server_host}, output: {output_file}, pid: {pid_file}")
-        return result[0].success if result else False
+        return success
 
     def stop_iperf_client(self, client_host: str, server_host: str = None, pid_file: str = None) -> bool:
         """
         Stop iperf3 client on the client_host using the PID file.
         """
-        if pid_file is None and server_host is not None:
-            pid_file = f"/tmp/iperf_client_{client_host}_to_{server_host}.pid"
-        elif pid_file is None:
-            pid_file = f"/tmp/iperf_client_{client_host}.pid"
-        cmd = f"if [ -f {pid_file} ]; then kill -9 $(cat {pid_file}) && rm -f {pid_file}; fi"
-        result = self.ssh_manager.execute_command(cmd, hosts=[client_host])
+        pid_file = pid_file or _client_paths(client_host, server_host).pid
+        cmd = _stop_cmd(pid_file)
+        success = self._ssh_exec(client_host, cmd)
         self.logger.info(f"Stopped iperf3 client on {client_host}, pid file: {pid_file}")
-        return result[0].success if result else False
+        return success
 
     def collect_stats_file_from_host(self, host: str, remote_path: str, local_path: str) -> bool:
         """
         Download a stats/result file from remote host to local path using SFTP.
+        
+        With config.verify_transfers the file is hashed as it is written and
+        compared with the remote copy; on mismatch the local file is removed
+        so a truncated file is never parsed.
         """
+        verify = self.config.verify_transfers
+        digest = hashlib.sha256()
         try:
-            ssh_client = self.ssh_manager.connection_pool.get_connection(
-                host, self.ssh_manager.config.port, self.ssh_manager.config.user,
-                self.ssh_manager.config.password, self.ssh_manager.config.key_file
-            )
-            sftp = ssh_client.open_sftp()
-            sftp.get(remote_path, local_path)
-            sftp.close()
+            with open(local_path, 'wb', buffering=DOWNLOAD_BUFFER_SIZE) as f:
+                self._sftp(host).getfo(remote_path, _HashingWriter(f, digest) if verify else f)
+            if verify:
+                self.verify_transfer(host, remote_path, digest.hexdigest())
             self.logger.info(f"Downloaded stats file from {host}: {remote_path} -> {local_path}")
             return True
+        except IperfTransferError as e:
+            self.logger.error(f"Failed to download stats file from {host}: {e}")
+            Path(local_path).unlink(missing_ok=True)
+            return False
         except Exception as e:
             self.logger.error(f"Failed to download stats file from {host}: {e}")
+            self._drop_client(host)
+            return False
+
+    def verify_transfer(self, host: str, remote_path: str, local_digest: str) -> bool:
+        """
+        Compare a downloaded file's SHA-256 with the remote file's.
+        
+        A remote that can't produce a digest (no sha256sum or shasum, or the
+        command fails) leaves the download unverified rather than rejected.
+        
+        :param host: Host the file was downloaded from
+        :param remote_path: Remote file path
+        :param local_digest: Hex SHA-256 of the local copy
+        :return: True if the digests were compared, False if the remote digest was unavailable
+        :raises IperfTransferError: If the remote digest differs
+        """
+        path = shlex.quote(remote_path)
+        # shasum covers macOS/BSD hosts without GNU coreutils
+        cmd = f"sha256sum {path} 2>/dev/null || shasum -a 256 {path}"
+        status, output = self._ssh_exec_output(host, cmd, DIGEST_TIMEOUT)
+        remote_digest = output.split(None, 1)[0].decode(errors='ignore') if output.strip() else ""
+        if status != 0 or not _SHA256_HEX_RE.fullmatch(remote_digest):
+            self.logger.warning(f"Could not hash {host}:{remote_path} (exit status {status}), "
+                                f"skipping transfer verification")
             return False
+        if remote_digest.lower() != local_digest:
+            raise IperfTransferError(f"SHA-256 mismatch for {host}:{remote_path}: "
+                                     f"remote {remote_digest}, local {local_digest}")
+        return True
 
-    def parse_iperf_file(self, file_path: str, expected_result: float = None, tolerance_pct: float = 10.0) -> dict:
+    def collect_many(self, jobs: List[Tuple[str, str, str]]) -> List[bool]:
+        """
+        Download many stats files concurrently over each host's cached SFTP session.
+
+        :param jobs: (host, remote_path, local_path) tuples
+        :return: Success per job, in order
+        """
+        if not jobs:
+            return []
+        workers = min(len(jobs), COLLECT_WORKERS)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda job: self.collect_stats_file_from_host(*job), jobs))
+
+    def parse_iperf_file(self, file_path: str = None, expected_result: float = None, tolerance_pct: float = 10.0, data: Dict[str, Any] = None) -> dict:
         """
         Parse a local iperf JSON result file, return summary stats, percentiles, and pass/fail if expected_result is given.
 
         :param file_path: Path to the iperf3 JSON output file
         :param expected_result: (Optional) Expected average throughput in Gbits/sec for pass/fail logic
         :param tolerance_pct: (Optional) Tolerance percentage for pass/fail (default 10%)
+        :param data: (Optional) Already-parsed iperf3 JSON document (e.g. IperfTestResult.parsed);
+            skips reading and parsing file_path
+        :return: dict as returned by parse_iperf_bytes
+        """
+        if data is not None:
+            return self._summarize_iperf(data, expected_result, tolerance_pct, source=file_path or "<parsed>")
+        try:
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+        except Exception as e:
+            self.logger.error(f"Failed to parse iperf file {file_path}: {e}")
+            return {}
+        return self.parse_iperf_bytes(raw, expected_result, tolerance_pct, source=file_path)
+
+    def parse_iperf_bytes(self, raw: Union[bytes, str], expected_result: float = None, tolerance_pct: float = 10.0, source: str = "<stream>") -> dict:
+        """
+        Parse iperf3 JSON output held in memory, return summary stats, percentiles, and pass/fail if expected_result is given.
+
+        :param raw: iperf3 -J output
+        :param expected_result: (Optional) Expected average throughput in Gbits/sec for pass/fail logic
+        :param tolerance_pct: (Optional) Tolerance percentage for pass/fail (default 10%)
+        :param source: Where the output came from, for logging
         :return: dict with keys:
             - sum_sent, sum_received, cpu_utilization_percent
             - throughput_percentiles (dict of percentiles)
@@ -496,23 +1265,36 @@ class IperfManager:
             - expected_result, tolerance_pct (if expected_result is given)
         """
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            data = _json_loads(raw)
+        except Exception as e:
+            self.logger.error(f"Failed to parse iperf output {source}: {e}")
+            return {}
+        return self._summarize_iperf(data, expected_result, tolerance_pct, source)
+
+    def _summarize_iperf(self, data: Dict[str, Any], expected_result: float = None, tolerance_pct: float = 10.0, source: str = "<parsed>") -> dict:
+        """
+        Summarize a parsed iperf3 JSON document; see parse_iperf_bytes for the returned keys.
+
+        :param data: Parsed iperf3 JSON document
+        :param expected_result: (Optional) Expected average throughput in Gbits/sec for pass/fail logic
+        :param tolerance_pct: (Optional) Tolerance percentage for pass/fail (default 10%)
+        :param source: Where the output came from, for logging
+        :return: Summary dict
+        """
+        try:
             summary = {}
-            percentiles = [10, 25, 50, 75, 90, 99]
-            throughput_values = []
-            # Extract interval throughputs (bits_per_second)
-            if 'intervals' in data:
-                for interval in data['intervals']:
-                    if 'sum' in interval and 'bits_per_second' in interval['sum']:
-                        throughput_values.append(interval['sum']['bits_per_second'] / 1e9)  # Convert to Gbits/sec
-            # Calculate percentiles if we have data
+            # Extract interval throughputs (bits_per_second), in Gbits/sec
+            throughput_values = np.fromiter(
+                (interval['sum']['bits_per_second'] for interval in data.get('intervals', ())
+                 if 'sum' in interval and 'bits_per_second' in interval['sum']),
+                dtype=np.float64
+            ) / 1e9
+            # Calculate percentiles if we have data; no full sort
             throughput_percentiles = {}
             avg_throughput = None
-            if throughput_values:
-                avg_throughput = float(np.mean(throughput_values))
-                for p in percentiles:
-                    throughput_percentiles[p] = float(np.percentile(throughput_values, p))
+            if throughput_values.size:
+                avg_throughput, values = _throughput_stats(throughput_values, THROUGHPUT_PERCENTILES)
+                throughput_percentiles = dict(zip(THROUGHPUT_PERCENTILES, values.tolist()))
             # Extract summary fields
             if 'end' in data:
                 summary['sum_sent'] = data['end'].get('sum_sent', {})
@@ -529,43 +1311,252 @@ class IperfManager:
                 summary['expected_result'] = expected_result
                 summary['tolerance_pct'] = tolerance_pct
                 summary['test_result_fail'] = test_result_fail
-            self.logger.info(f"Parsed iperf file {file_path}: {summary}")
+            self.logger.info(f"Parsed iperf output {source}: {summary}")
             return summary
         except Exception as e:
-            self.logger.error(f"Failed to parse iperf file {file_path}: {e}")
+            self.logger.error(f"Failed to parse iperf output {source}: {e}")
             return {}
 
-    def run_full_iperf_workflow(self, client_host: str, server_host: str, port: int = 5201, duration: int = 60, parallel_streams: int = 1, mtu_size: int = 1460, interval: int = 2, output_dir: str = "iperf_results") -> dict:
+    def run_full_iperf_workflow(self, client_host: str, server_host: str, port: int = 5201, duration: int = 60, parallel_streams: int = 1, mtu_size: int = 1460, interval: int = 2, output_dir: str = "iperf_results", detached: bool = False) -> dict:
         """
         Full workflow: start server/client, stop, collect file, parse results.
         Returns parsed stats dict.
         """
-        # File paths
-        server_output = f"/tmp/iperf_server_{server_host}.json"
-        server_pid = f"/tmp/iperf_server_{server_host}.pid"
-        client_output = f"/tmp/iperf_client_{client_host}_to_{server_host}.json"
-        client_pid = f"/tmp/iperf_client_{client_host}_to_{server_host}.pid"
-        local_client_file = f"{output_dir}/iperf_client_{client_host}_to_{server_host}.json"
-        local_server_file = f"{output_dir}/iperf_server_{server_host}.json"
-        # Start server
-        self.start_iperf_server(server_host, port, server_output, server_pid)
-        time.sleep(2)
-        # Start client
-        self.start_iperf_client(client_host, server_host, port, duration, client_output, client_pid, parallel_streams, mtu_size, interval)
-        # Wait for test duration
-        time.sleep(duration + 5)
-        # Stop client and server
-        self.stop_iperf_client(client_host, server_host, client_pid)
-        self.stop_iperf_server(server_host, server_pid)
-        # Collect files
+        results = self.run_full_iperf_workflow_many(
+            [(client_host, server_host)], port, duration, parallel_streams, mtu_size, interval, output_dir,
+            detached
+        )
+        return results[f"{client_host}_to_{server_host}"]
+
+    def run_full_iperf_workflow_many(self, client_server_pairs: List[Tuple[str, str]], port: int = 5201, duration: int = 60, parallel_streams: int = 1, mtu_size: int = 1460, interval: int = 2, output_dir: str = "iperf_results", detached: bool = False) -> Dict[str, dict]:
+        """
+        Run the full workflow for many client-server pairs concurrently, so
+        wall-clock time follows the longest test rather than the sum.
+
+        Pairs sharing a server host get consecutive ports (port, port + 1, ...)
+        and their own server files, since one iperf3 server runs one test at a time.
+
+        :param client_server_pairs: List of (client_host, server_host) tuples
+        :param port: Base iperf3 port
+        :param duration: Test duration in seconds
+        :param parallel_streams: Parallel streams per client
+        :param mtu_size: TCP MSS passed to -M
+        :param interval: Reporting interval in seconds
+        :param output_dir: Local directory for collected files
+        :param detached: Run clients in the background writing to remote files that
+            are fetched over SFTP, instead of streaming their JSON over the SSH channel
+        :return: Dictionary mapping "client_to_server" keys to {'client': ..., 'server': ...}
+        """
+        return _run_coroutine(self._run_pairs_workflow(
+            client_server_pairs, port, duration, parallel_streams, mtu_size, interval, output_dir, detached
+        ))
+
+    async def _run_pairs_workflow(self, client_server_pairs: List[Tuple[str, str]], port: int, duration: int,
+                                  parallel_streams: int, mtu_size: int, interval: int,
+                                  output_dir: str, detached: bool = False) -> Dict[str, dict]:
+        """
+        Run the workflow for all pairs concurrently.
+
+        Each phase sends one script per host covering every pair on it, so
+        channel opens scale with hosts rather than pairs x steps.
+        """
+        pairs = []
+        servers_seen: Dict[str, int] = {}
+        for client_host, server_host in client_server_pairs:
+            n = servers_seen.get(server_host, 0)
+            servers_seen[server_host] = n + 1
+            server_tag = server_host if n == 0 else f"{server_host}_{port + n}"
+            server_paths = _server_paths(server_tag)
+            client_paths = _client_paths(client_host, server_host)
+            pairs.append({
+                'key': f"{client_host}_to_{server_host}",
+                'client_host': client_host,
+                'server_host': server_host,
+                'port': port + n,
+                'server_output': server_paths.output,
+                'server_pid': server_paths.pid,
+                'client_output': client_paths.output,
+                'client_pid': client_paths.pid,
+                'local_client_file': f"{output_dir}/iperf_client_{client_host}_to_{server_host}.json",
+                'local_server_file': f"{output_dir}/iperf_server_{server_tag}.json",
+            })
+
+        # Start servers, one script per server host
+        server_starts: Dict[str, Tuple[List[str], List[str]]] = {}
+        for pair in pairs:
+            cmds, pid_files = server_starts.setdefault(pair['server_host'], ([], []))
+            cmds.append(_server_start_cmd(pair['port'], pair['server_output'], pair['server_pid']))
+            pid_files.append(pair['server_pid'])
+        await self._exec_per_host({host: _batch_start_cmd(cmds, pid_files)
+                                   for host, (cmds, pid_files) in server_starts.items()}, "Started iperf3 servers")
+        # Wait until the servers listen instead of for a fixed delay
+        ports: Dict[str, List[int]] = {}
+        for pair in pairs:
+            ports.setdefault(pair['server_host'], []).append(pair['port'])
+        not_ready = await self._poll_until({host: _all_listening_cmd(host_ports)
+                                            for host, host_ports in ports.items()}, SERVER_START_TIMEOUT)
+        if not_ready:
+            self.logger.warning(f"iperf3 servers not confirmed listening on {not_ready}, starting clients anyway")
+
+        if not detached:
+            return await self._run_streamed_clients(pairs, duration, parallel_streams, mtu_size, interval,
+                                                    output_dir)
+
+        # Start clients, one script per client host
+        flags = _client_tuning_flags(self.config)
+        client_starts: Dict[str, Tuple[List[str], List[str]]] = {}
+        for pair in pairs:
+            cmds, pid_files = client_starts.setdefault(pair['client_host'], ([], []))
+            cmds.append(_client_start_cmd(pair['server_host'], pair['port'], duration, parallel_streams,
+                                          mtu_size, interval, pair['client_output'], pair['client_pid'],
+                                          flags))
+            pid_files.append(pair['client_pid'])
+        await self._exec_per_host({host: _batch_start_cmd(cmds, pid_files)
+                                   for host, (cmds, pid_files) in client_starts.items()}, "Started iperf3 clients")
+
+        # Wait for the clients to exit rather than for a fixed duration,
+        # checking every client on a host in one command
+        still_running = await self._poll_until({host: _all_exited_cmd(pid_files)
+                                                for host, (_, pid_files) in client_starts.items()},
+                                               duration + PID_WAIT_GRACE)
+        for host in still_running:
+            self.logger.warning(f"iperf3 clients on {host} still running after "
+                                f"{duration + PID_WAIT_GRACE}s, stopping them")
+
+        # Stop clients and servers, one script per host
+        stops: Dict[str, List[str]] = {}
+        for pair in pairs:
+            stops.setdefault(pair['client_host'], []).append(_stop_cmd(pair['client_pid']))
+            stops.setdefault(pair['server_host'], []).append(_stop_cmd(pair['server_pid']))
+        await self._exec_per_host({host: "; ".join(cmds) for host, cmds in stops.items()},
+                                  "Stopped iperf3 processes")
+
+        # Collect files; with --get-server-output the server side is already
+        # inside the client file
+        fetch_server = not self.config.get_server_output
         Path(output_dir).mkdir(parents=True, exist_ok=True)
-        self.collect_stats_file_from_host(client_host, client_output, local_client_file)
-        self.collect_stats_file_from_host(server_host, server_output, local_server_file)
+        jobs = []
+        for pair in pairs:
+            jobs.append((pair['client_host'], pair['client_output'], pair['local_client_file']))
+            if fetch_server:
+                jobs.append((pair['server_host'], pair['server_output'], pair['local_server_file']))
+        await asyncio.to_thread(self.collect_many, jobs)
+
         # Parse results
-        client_stats = self.parse_iperf_file(local_client_file)
-        server_stats = self.parse_iperf_file(local_server_file)
-        return {'client': client_stats, 'server': server_stats}
+        results = {}
+        for pair in pairs:
+            try:
+                with open(pair['local_client_file'], 'rb') as f:
+                    raw = f.read()
+            except OSError as e:
+                self.logger.error(f"Failed to parse iperf file {pair['local_client_file']}: {e}")
+                raw = b""
+            results[pair['key']] = self._summarize_pair(
+                pair, raw, pair['local_client_file'])
+        return results
+
+    async def _run_streamed_clients(self, pairs: List[Dict[str, Any]], duration: int, parallel_streams: int,
+                                    mtu_size: int, interval: int, output_dir: str) -> Dict[str, dict]:
+        """
+        Run each client in the foreground and parse its JSON straight from
+        the SSH channel, skipping the remote file and the SFTP fetch. The
+        JSON is still saved to the pair's local client file, as in detached mode.
+
+        :param pairs: Pair plans built by _run_pairs_workflow, servers already started
+        :return: Dictionary mapping "client_to_server" keys to {'client': ..., 'server': ...}
+        """
+        timeout = duration + PID_WAIT_GRACE
+        flags = _client_tuning_flags(self.config)
+        outputs = await asyncio.gather(*(
+            asyncio.to_thread(self._ssh_exec_output, pair['client_host'],
+                              _client_cmd(pair['server_host'], pair['port'], duration, parallel_streams,
+                                          mtu_size, interval, flags), timeout)
+            for pair in pairs
+        ))
+
+        # Stop servers, one script per host
+        stops: Dict[str, List[str]] = {}
+        for pair in pairs:
+            stops.setdefault(pair['server_host'], []).append(_stop_cmd(pair['server_pid']))
+        await self._exec_per_host({host: "; ".join(cmds) for host, cmds in stops.items()},
+                                  "Stopped iperf3 servers")
+
+        # Keep the client JSON where the detached mode downloads it to
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(self._save_client_outputs, pairs, [output for _, output in outputs])
+
+        # Only the server side still lives in a remote file, and not even
+        # that with --get-server-output
+        if not self.config.get_server_output:
+            await asyncio.to_thread(self.collect_many, [
+                (pair['server_host'], pair['server_output'], pair['local_server_file']) for pair in pairs
+            ])
+
+        results = {}
+        for pair, (exit_status, output) in zip(pairs, outputs):
+            source = pair['local_client_file']
+            if exit_status != 0:
+                self.logger.warning(f"iperf3 client on {pair['client_host']} exited with status {exit_status}")
+            results[pair['key']] = self._summarize_pair(pair, output, source)
+        return results
 
+    def _save_client_outputs(self, pairs: List[Dict[str, Any]], outputs: List[bytes]):
+        """
+        Write streamed client JSON to each pair's local client file.
+
+        :param pairs: Pair plans built by _run_pairs_workflow
+        :param outputs: Client iperf3 -J output per pair
+        """
+        for pair, output in zip(pairs, outputs):
+            try:
+                _write_atomic(pair['local_client_file'], output, self.config.fsync_results)
+            except OSError as e:
+                self.logger.error(f"Failed to save iperf output {pair['local_client_file']}: {e}")
+
+    def _summarize_pair(self, pair: Dict[str, Any], raw: Union[bytes, str], source: str) -> Dict[str, dict]:
+        """
+        Summarize one pair's client output and the matching server output.
+
+        :param pair: Pair plan built by _run_pairs_workflow
+        :param raw: Client iperf3 -J output
+        :param source: Where the client output came from, for logging
+        :return: {'client': ..., 'server': ...}
+        """
+        if not self.config.get_server_output:
+            return {
+                'client': self.parse_iperf_bytes(raw, source=source),
+                'server': self.parse_iperf_file(pair['local_server_file'])
+            }
+        try:
+            data = _json_loads(raw)
+        except Exception as e:
+            self.logger.error(f"Failed to parse iperf output {source}: {e}")
+            return {'client': {}, 'server': {}}
+        # The server's report, embedded by --get-server-output
+        server_data = data.get('server_output_json')
+        if server_data is None:
+            self.logger.warning(f"No server_output_json in iperf output {source}")
+        return {
+            'client': self._summarize_iperf(data, source=source),
+            'server': self._summarize_iperf(server_data, source=f"{source}#server") if server_data else {}
+        }
+
+    async def _exec_per_host(self, scripts: Dict[str, str], action: str) -> Dict[str, bool]:
+        """
+        Run one script per host concurrently.
+
+        :param scripts: Mapping of host to shell script
+        :param action: Description used for logging
+        :return: Mapping of host to success
+        """
+        hosts = list(scripts)
+        results = await asyncio.gather(*(asyncio.to_thread(self._ssh_exec, host, scripts[host]) for host in hosts))
+        for host, success in zip(hosts, results):
+            if success:
+                self.logger.info(f"{action} on {host}")
+            else:
+                self.logger.warning(f"{action} on {host} failed")
+        return dict(zip(hosts, results))
 
 def create_iperf_test_scenario(client_hosts: List[str], server_hosts: List[str], 
                               test_config: Optional[IperfTestConfig] = None) -> List[Tuple[str, str]]:
@@ -578,11 +1569,5 @@ def create_iperf_test_scenario(client_hosts: List[str], server_hosts: List[str],
     
     :return: List of (client_host, server_host) pairs
     """
-    pairs = []
-    
     # Create pairs - each client tests against each server
-    for client_host in client_hosts:
-        for server_host in server_hosts:
-            pairs.append((client_host, server_host))
-    
-    return pairs 
\ No newline at end of file
+    return list(itertools.product(client_hosts, server_hosts)) 
\ No newline at end of file
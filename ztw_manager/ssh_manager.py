@@ -117,14 +117,16 @@ class SSHManager:
                 max_connections=self.config.connection_pool_size,
                 max_idle_time=self.config.connection_idle_timeout,
                 connection_timeout=self.config.timeout,
-                health_check_interval=60
+                health_check_interval=60,
+                allow_legacy_algorithms=self.config.security.allow_legacy_algorithms
             )
         else:
             return ConnectionPool(
                 max_connections=self.config.connection_pool_size,
                 max_idle_time=self.config.connection_idle_timeout,
                 connection_timeout=self.config.timeout,
-                health_check_interval=60
+                health_check_interval=60,
+                allow_legacy_algorithms=self.config.security.allow_legacy_algorithms
             )
     
     def _get_host_logger(self, host: str) -> HostLogger: